@@ -0,0 +1 @@
+"""성능 측정 스크립트 모음 (python -m benchmarks.run, python -m benchmarks.startup)"""
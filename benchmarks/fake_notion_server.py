@@ -0,0 +1,262 @@
+"""로컬 Notion API 대역 HTTP 서버 (지연, 속도 제한, 오류 주입)
+
+사용법:
+    python -m benchmarks.fake_notion_server [--port 8765] [--latency 0.1] [--jitter 0.05]
+        [--rate-limit 0.05] [--requests-per-second 3] [--error-rate 0.01]
+        [--applied-errors 0.5] [--seed 0]
+
+업로더가 쓰는 엔드포인트(pages 생성/조회, blocks 자식 조회/추가, blocks 수정/삭제,
+users/me)를 benchmarks.notion_standin.NotionStore로 처리한다. 시작할 때 조 편성
+템플릿과 같은 구조의 부모 페이지/템플릿 페이지를 만들고 그 ID를 출력하므로,
+config.ini의 [Notion] 섹션에 다음처럼 적으면 앱이 이 서버로 업로드한다.
+
+    base_url = http://127.0.0.1:8765
+    parent_page_id = <출력된 부모 페이지 ID>
+    template_page_id = <출력된 템플릿 페이지 ID>
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.notion_standin import NotionStore, StandInError, add_template
+
+
+# (메서드, 경로 정규식) → 처리 함수 이름
+ROUTES = [
+    ('POST', re.compile(r'^/v1/pages$'), 'create_page'),
+    ('GET', re.compile(r'^/v1/pages/([\w-]+)$'), 'retrieve_page'),
+    ('GET', re.compile(r'^/v1/blocks/([\w-]+)/children$'), 'list_children'),
+    ('PATCH', re.compile(r'^/v1/blocks/([\w-]+)/children$'), 'append_children'),
+    ('GET', re.compile(r'^/v1/blocks/([\w-]+)$'), 'retrieve_block'),
+    ('PATCH', re.compile(r'^/v1/blocks/([\w-]+)$'), 'update_block'),
+    ('DELETE', re.compile(r'^/v1/blocks/([\w-]+)$'), 'delete_block'),
+    ('GET', re.compile(r'^/v1/users/me$'), 'me'),
+]
+
+# 무작위로 돌려줄 서버 오류
+SERVER_ERRORS = [
+    (500, 'internal_server_error', "Unexpected error occurred."),
+    (502, 'internal_server_error', "Bad gateway."),
+    (503, 'service_unavailable', "Notion is unavailable, please try again later."),
+]
+
+
+class FaultInjector:
+    """요청마다 지연을 더하고 정해진 비율로 429/5xx 응답을 결정
+
+    5xx 중 applied_errors 비율은 요청을 처리한 뒤에 돌려준다 (실제 Notion처럼
+    오류 응답을 받았지만 쓰기는 반영된 경우).
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, rate_limit=0.0, requests_per_second=None,
+                 error_rate=0.0, retry_after=1.0, seed=None, applied_errors=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.requests_per_second = requests_per_second
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.applied_errors = applied_errors
+        self.rng = random.Random(seed)
+        self.counts = {'requests': 0, 'rate_limited': 0, 'errors': 0, 'applied_errors': 0}
+        self._recent = deque()  # 최근 1초 동안 받은 요청 시각
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            extra = self.rng.uniform(0, self.jitter) if self.jitter else 0.0
+        return self.latency + extra
+
+    def check(self):
+        """주입할 오류가 있으면 (StandInError, 응답 헤더, 처리 후 응답 여부) 반환, 없으면 None"""
+        with self._lock:
+            self.counts['requests'] += 1
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= 1.0:
+                self._recent.popleft()
+            over_limit = (self.requests_per_second is not None
+                          and len(self._recent) >= self.requests_per_second)
+            if not over_limit:
+                self._recent.append(now)
+
+            roll = self.rng.random()
+            if over_limit or roll < self.rate_limit:
+                self.counts['rate_limited'] += 1
+                return (StandInError(429, 'rate_limited',
+                                     "You have been rate limited. Please try again in a few minutes."),
+                        {'Retry-After': f"{self.retry_after:g}"}, False)
+            if roll < self.rate_limit + self.error_rate:
+                self.counts['errors'] += 1
+                status, code, message = self.rng.choice(SERVER_ERRORS)
+                applied = self.rng.random() < self.applied_errors
+                if applied:
+                    self.counts['applied_errors'] += 1
+                return StandInError(status, code, message), {}, applied
+        return None
+
+
+class NotionRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'FakeNotion/1.0'
+    protocol_version = 'HTTP/1.1'  # keep-alive 연결 재사용
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode('utf-8'))
+
+    def _handle(self, method):
+        url = urlsplit(self.path)
+        body = self._read_body()
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        time.sleep(self.server.faults.delay())
+        injected = self.server.faults.check()
+        if injected is not None and not injected[2]:
+            error, headers, _ = injected
+            self._send(error.status, error.body(), headers)
+            return
+
+        for route_method, pattern, name in ROUTES:
+            match = pattern.match(url.path)
+            if route_method == method and match:
+                break
+        else:
+            self._send(400, StandInError(400, 'invalid_request_url',
+                                         "Invalid request URL.").body())
+            return
+
+        try:
+            with self.server.lock:
+                result = self._dispatch(name, match.groups(), body, query)
+        except StandInError as error:
+            self._send(error.status, error.body())
+        else:
+            if injected is not None:
+                # 요청은 처리했지만 오류로 응답
+                error, headers, _ = injected
+                self._send(error.status, error.body(), headers)
+                return
+            self._send(200, result)
+
+    def _dispatch(self, name, args, body, query):
+        store = self.server.store
+        if name == 'create_page':
+            return store.create_page(body.get('parent'), body.get('properties'),
+                                     body.get('children'))
+        if name == 'list_children':
+            return store.list_children(args[0], query.get('start_cursor'),
+                                       query.get('page_size'))
+        if name == 'append_children':
+            return store.append_children(args[0], body.get('children') or [], body.get('after'))
+        if name == 'update_block':
+            return store.update_block(args[0], **body)
+        return getattr(store, name)(*args)
+
+
+class FakeNotionServer(ThreadingHTTPServer):
+    """NotionStore를 HTTP로 제공하는 서버 (start()로 백그라운드 실행 가능)"""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, store=None, faults=None, verbose=False):
+        super().__init__((host, port), NotionRequestHandler)
+        self.store = store or NotionStore()
+        self.faults = faults or FaultInjector()
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.fake_notion_server',
+                                     description="로컬 Notion API 대역 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="요청마다 더할 지연(초)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="지연에 더할 무작위 범위(초)")
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help="429 응답 비율 (0~1)")
+    parser.add_argument('--requests-per-second', type=float, default=None,
+                        help="초당 이보다 많은 요청은 429로 응답")
+    parser.add_argument('--retry-after', type=float, default=1.0,
+                        help="429 응답의 Retry-After(초)")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="500/502/503 응답 비율 (0~1)")
+    parser.add_argument('--applied-errors', type=float, default=0.0,
+                        help="5xx 중 요청을 처리한 뒤에 돌려줄 비율 (0~1)")
+    parser.add_argument('--template-blocks', type=int, default=0,
+                        help="템플릿에 더할 문단 블록 수")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('-v', '--verbose', action='store_true', help="요청 로그 출력")
+    args = parser.parse_args(argv)
+
+    faults = FaultInjector(args.latency, args.jitter, args.rate_limit, args.requests_per_second,
+                           args.error_rate, args.retry_after, args.seed, args.applied_errors)
+    server = FakeNotionServer(args.host, args.port, faults=faults, verbose=args.verbose)
+    parent_id, template_id = add_template(server.store, args.template_blocks)
+    print(f"base_url = {server.base_url}")
+    print(f"parent_page_id = {parent_id}")
+    print(f"template_page_id = {template_id}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"요청 {faults.counts['requests']}건, 429 {faults.counts['rate_limited']}건, "
+              f"오류 {faults.counts['errors']}건 (처리 후 오류 {faults.counts['applied_errors']}건)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
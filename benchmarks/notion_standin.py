@@ -0,0 +1,298 @@
+"""메모리 안에서 동작하는 Notion API 대역 (벤치마크와 오프라인 업로드 확인용)
+
+NotionStore는 업로더가 쓰는 엔드포인트의 상태와 규칙(페이지 크기, 한 번에 추가할 수
+있는 자식 블록 100개 제한 등)을 흉내 내고, StandInClient는 notion_client.AsyncClient와
+같은 모양(pages, blocks.children, users)으로 그 저장소를 감싼다.
+"""
+import asyncio
+import copy
+import itertools
+from datetime import datetime, timezone
+
+import httpx
+from notion_client.errors import APIResponseError
+
+
+MAX_PAGE_SIZE = 100       # blocks.children.list 한 번에 돌려주는 최대 블록 수
+MAX_APPEND_CHILDREN = 100  # blocks.children.append 한 번에 추가할 수 있는 최대 블록 수
+
+
+class StandInError(Exception):
+    """Notion 오류 응답 (status, code, message)"""
+
+    def __init__(self, status, code, message):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+    def body(self):
+        return {'object': 'error', 'status': self.status, 'code': self.code, 'message': self.message}
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+class NotionStore:
+    """페이지와 블록을 메모리에 저장하는 Notion 대역"""
+
+    def __init__(self):
+        self.blocks = {}   # ID → 블록 (자식은 ID 목록으로 보관)
+        self.requests = 0  # 처리한 요청 수
+        self._ids = itertools.count(1)
+
+    def _new_id(self):
+        return f"{next(self._ids):032x}"
+
+    def _get(self, block_id):
+        block = self.blocks.get(block_id.replace('-', ''))
+        if block is None or block['archived']:
+            raise StandInError(404, 'object_not_found', f"Could not find block with ID: {block_id}.")
+        return block
+
+    def _public(self, block):
+        """API 응답 형식의 블록"""
+        if block['type'] == 'page':
+            return {
+                'object': 'page', 'id': block['id'], 'archived': block['archived'],
+                'parent': block['parent'], 'properties': block['properties'],
+                'created_time': block['created_time'], 'last_edited_time': block['last_edited_time'],
+            }
+        return {
+            'object': 'block', 'id': block['id'], 'type': block['type'],
+            block['type']: copy.deepcopy(block['data']),
+            'has_children': bool(block['children']), 'archived': block['archived'],
+            'created_time': block['created_time'], 'last_edited_time': block['last_edited_time'],
+        }
+
+    def _listed(self, block):
+        """자식 목록에 나오는 형식의 블록 (하위 페이지는 child_page 블록으로 보임)"""
+        if block['type'] != 'page':
+            return self._public(block)
+        title = ''.join(part['text']['content']
+                        for part in block['properties']['title']['title'])
+        return {
+            'object': 'block', 'id': block['id'], 'type': 'child_page',
+            'child_page': {'title': title},
+            'has_children': bool(block['children']), 'archived': block['archived'],
+            'created_time': block['created_time'], 'last_edited_time': block['last_edited_time'],
+        }
+
+    def _insert(self, parent, children):
+        created = []
+        for child in children:
+            block_type = child.get('type')
+            if not block_type or block_type not in child:
+                raise StandInError(400, 'validation_error', "body.children: block type is missing.")
+            data = copy.deepcopy(child[block_type])
+            nested = data.pop('children', None) or []
+            now = _now()
+            block = {
+                'id': self._new_id(), 'type': block_type, 'data': data, 'children': [],
+                'parent': parent['id'], 'archived': False,
+                'created_time': now, 'last_edited_time': now,
+            }
+            self.blocks[block['id']] = block
+            parent['children'].append(block['id'])
+            self._insert(block, nested)
+            created.append(block)
+        return created
+
+    def add_page(self, title, parent_id=None, children=()):
+        """페이지 생성 (parent_id가 없으면 워크스페이스 최상위), 페이지 ID 반환"""
+        now = _now()
+        page = {
+            'id': self._new_id(), 'type': 'page', 'children': [], 'archived': False,
+            'parent': {'type': 'page_id', 'page_id': parent_id} if parent_id
+            else {'type': 'workspace', 'workspace': True},
+            'properties': {'title': {'title': [{'text': {'content': title}}]}},
+            'created_time': now, 'last_edited_time': now,
+        }
+        self.blocks[page['id']] = page
+        if parent_id:
+            self.blocks[parent_id]['children'].append(page['id'])
+        self._insert(page, list(children))
+        return page['id']
+
+    # --- 엔드포인트 ---
+
+    def create_page(self, parent, properties, children=None):
+        self.requests += 1
+        parent_id = (parent or {}).get('page_id')
+        if not parent_id:
+            raise StandInError(400, 'validation_error', "body.parent.page_id should be defined.")
+        self._get(parent_id)
+        if children and len(children) > MAX_APPEND_CHILDREN:
+            raise StandInError(400, 'validation_error',
+                               f"body.children.length should be ≤ {MAX_APPEND_CHILDREN}.")
+        page_id = self.add_page('', parent_id, children or ())
+        self.blocks[page_id]['properties'] = copy.deepcopy(properties)
+        return self._public(self.blocks[page_id])
+
+    def retrieve_page(self, page_id):
+        self.requests += 1
+        page = self._get(page_id)
+        if page['type'] != 'page':
+            raise StandInError(404, 'object_not_found', f"Could not find page with ID: {page_id}.")
+        return self._public(page)
+
+    def list_children(self, block_id, start_cursor=None, page_size=MAX_PAGE_SIZE):
+        self.requests += 1
+        parent = self._get(block_id)
+        page_size = min(int(page_size or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        child_ids = [child_id for child_id in parent['children']
+                     if not self.blocks[child_id]['archived']]
+        start = child_ids.index(start_cursor) if start_cursor in child_ids else 0
+        chunk = child_ids[start:start + page_size]
+        next_cursor = child_ids[start + page_size] if start + page_size < len(child_ids) else None
+        return {
+            'object': 'list', 'type': 'block', 'block': {},
+            'results': [self._listed(self.blocks[child_id]) for child_id in chunk],
+            'has_more': next_cursor is not None, 'next_cursor': next_cursor,
+        }
+
+    def append_children(self, block_id, children, after=None):
+        self.requests += 1
+        parent = self._get(block_id)
+        if len(children) > MAX_APPEND_CHILDREN:
+            raise StandInError(400, 'validation_error',
+                               f"body.children.length should be ≤ {MAX_APPEND_CHILDREN}, "
+                               f"instead was {len(children)}.")
+        created = self._insert(parent, children)
+        if after is not None:
+            # 새 블록들을 after 블록 바로 뒤로 옮김
+            ids = [block['id'] for block in created]
+            rest = [child_id for child_id in parent['children'] if child_id not in ids]
+            position = rest.index(after.replace('-', '')) + 1
+            parent['children'] = rest[:position] + ids + rest[position:]
+        parent['last_edited_time'] = _now()
+        return {'object': 'list', 'type': 'block', 'block': {},
+                'results': [self._public(block) for block in created],
+                'has_more': False, 'next_cursor': None}
+
+    def retrieve_block(self, block_id):
+        self.requests += 1
+        return self._public(self._get(block_id))
+
+    def update_block(self, block_id, **body):
+        self.requests += 1
+        block = self._get(block_id)
+        if body.get('archived') or body.get('in_trash'):
+            block['archived'] = True
+        if block['type'] in body:
+            block['data'].update(copy.deepcopy(body[block['type']]))
+        block['last_edited_time'] = _now()
+        return self._public(block)
+
+    def delete_block(self, block_id):
+        self.requests += 1
+        block = self._get(block_id)
+        block['archived'] = True
+        return self._public(block)
+
+    def me(self):
+        self.requests += 1
+        return {'object': 'user', 'id': 'standin-bot', 'type': 'bot', 'name': 'stand-in', 'bot': {}}
+
+
+def _api_error(error):
+    """StandInError를 notion_client가 던지는 것과 같은 APIResponseError로 변환"""
+    response = httpx.Response(error.status, json=error.body(),
+                              request=httpx.Request('POST', 'http://notion.standin'))
+    return APIResponseError(response, error.message, error.code)
+
+
+class _Endpoint:
+    def __init__(self, client, handler, endpoint):
+        self._client = client
+        self._handler = handler
+        self.endpoint = endpoint  # 추적 span 이름 (예: blocks.children.list)
+
+    async def __call__(self, *args, **kwargs):
+        return await self._client._call(self._handler, *args, **kwargs)
+
+
+class StandInClient:
+    """notion_client.AsyncClient 대신 쓸 수 있는 대역 클라이언트
+
+    latency초만큼 기다린 뒤 저장소에서 요청을 처리한다.
+    """
+
+    def __init__(self, store=None, latency=0.0):
+        self.store = store or NotionStore()
+        self.latency = latency
+        store = self.store
+        self.pages = type('Pages', (), {})()
+        self.pages.create = _Endpoint(self, store.create_page, 'pages.create')
+        self.pages.retrieve = _Endpoint(self, store.retrieve_page, 'pages.retrieve')
+        self.blocks = type('Blocks', (), {})()
+        self.blocks.retrieve = _Endpoint(self, store.retrieve_block, 'blocks.retrieve')
+        self.blocks.update = _Endpoint(self, store.update_block, 'blocks.update')
+        self.blocks.delete = _Endpoint(self, store.delete_block, 'blocks.delete')
+        self.blocks.children = type('Children', (), {})()
+        self.blocks.children.list = _Endpoint(self, store.list_children, 'blocks.children.list')
+        self.blocks.children.append = _Endpoint(self, store.append_children, 'blocks.children.append')
+        self.users = type('Users', (), {})()
+        self.users.me = _Endpoint(self, store.me, 'users.me')
+
+    async def _call(self, handler, *args, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        try:
+            return handler(*args, **kwargs)
+        except StandInError as error:
+            raise _api_error(error) from None
+
+    async def aclose(self):
+        pass
+
+
+# --- 템플릿 ---
+
+def _text(content):
+    return [{'type': 'text', 'text': {'content': content}}]
+
+
+def _table(header):
+    return {'type': 'table', 'table': {
+        'table_width': len(header), 'has_column_header': True, 'has_row_header': False,
+        'children': [{'type': 'table_row', 'table_row': {'cells': [_text(h) for h in header]}}],
+    }}
+
+
+def _paragraph(content):
+    return {'type': 'paragraph', 'paragraph': {'rich_text': _text(content)}}
+
+
+def add_template(store, filler_blocks=0):
+    """실제 조 편성 템플릿과 같은 구조의 부모 페이지와 템플릿 페이지 생성
+
+    기본 정보, 페어링, 조편성 테이블이 이 순서로 들어 있으며 페어링은 토글 안,
+    조편성은 열(column) 안에 있다. filler_blocks만큼 문단을 더 넣을 수 있다.
+    (부모 페이지 ID, 템플릿 페이지 ID) 반환
+    """
+    parent_id = store.add_page('조 편성')
+    template_id = store.add_page('조 편성 템플릿', parent_id, [
+        _paragraph('스매시 정기 운동'),
+        _table(['장소', '코트', '인원', '시간']),
+        {'type': 'toggle', 'toggle': {'rich_text': _text('페어링'), 'children': [
+            _table(['No.', '팀1', '팀2']),
+        ]}},
+        {'type': 'column_list', 'column_list': {'children': [
+            {'type': 'column', 'column': {'children': [_table(['No.', 'A', 'B', 'C'])]}},
+            {'type': 'column', 'column': {'children': [_paragraph('메모')]}},
+        ]}},
+    ] + [_paragraph(f'안내 {i}') for i in range(filler_blocks)])
+    return parent_id, template_id
+
+
+def table_rows(store, table_id):
+    """테이블 블록의 행을 셀 문자열 목록으로 반환 (결과 확인용)"""
+    rows = []
+    for row_id in store.blocks[table_id]['children']:
+        if store.blocks[row_id]['archived']:
+            continue
+        cells = store.blocks[row_id]['data']['cells']
+        rows.append([''.join(part['text']['content'] for part in cell) for cell in cells])
+    return rows
@@ -0,0 +1,300 @@
+"""단계별 성능 측정
+
+사용법:
+    python -m benchmarks.run [--sizes 30 100 1000 10000] [-r REPEAT]
+                             [-o results.json] [--baseline old.json] [--threshold 1.25]
+
+가상 세션(benchmarks.synthetic)을 인원 규모별로 만들어 다음 단계의 시간을 잰다.
+
+- tokenize: 接龙/레슨 텍스트에서 이름 추출
+- order / pairing / grouping: 정렬, 레슨 제외 후 페어링, 조 편성
+- generate_teams: 위 단계 전체
+- treeview: 결과 표를 처음 채우기 (화면이 없으면 Xvfb 가상 화면 사용, 둘 다 없으면 건너뜀)
+- treeview_update: 한 행만 바뀐 결과로 다시 그리기
+- export_xlsx: xlsx + CSV 내보내기
+- payload: Notion 테이블 행 요청 본문 만들기
+- upload: 메모리 Notion 대역(benchmarks.notion_standin)에 전체 업로드
+
+각 단계는 REPEAT번 실행한 최솟값(초)을 기록하며 결과는 JSON으로 저장한다.
+--baseline을 주면 이전 결과보다 threshold배 넘게 느려진 단계를 표시하고 1로 종료한다.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from excel_to_notion import AsyncExcelToNotionImporter
+from jielong_tokenizer import tokenize
+from notion_scheduler import RequestScheduler
+from result_export import export_xlsx
+from roster import RosterIndex
+from team_engine import (ROW_LESSON, ROW_PAIR, ROW_SOLO, exclude_lesson,
+                         fold_pairs, generate_teams, group_attendees, lesson_names,
+                         order_attendees, pair_lessons, pick_last_player)
+
+from benchmarks.notion_standin import NotionStore, StandInClient, add_template
+from benchmarks.synthetic import make_session
+
+
+DEFAULT_SIZES = (30, 100, 1000, 10000)
+# 이전 결과와 비교할 때 이보다 작은 차이(초)는 측정 잡음으로 보고 무시
+MIN_REGRESSION_SECONDS = 0.0005
+
+
+def best_of(repeat, func, setup=None):
+    """func를 repeat번 실행한 최소 시간(초), setup은 매번 측정 밖에서 실행"""
+    best = None
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        func(arg) if setup else func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def pairing(ordered, lesson_names):
+    pairing_list = exclude_lesson(ordered, lesson_names)
+    pairs = []
+    if len(pairing_list) % 2 != 0:
+        solo_player = pick_last_player(pairing_list)
+        pairing_list.remove(solo_player)
+        pairs.append((solo_player, '', ROW_SOLO))
+    return [(t1, t2, ROW_PAIR) for t1, t2 in fold_pairs(pairing_list)] + pairs + [
+        (t1, t2, ROW_LESSON) for t1, t2 in pair_lessons(lesson_names)]
+
+
+# --- 화면 ---
+
+@contextlib.contextmanager
+def virtual_display():
+    """Tk를 띄울 수 있는 화면 준비, 사용할 수 없으면 None을 넘김"""
+    if sys.platform != 'linux' or os.environ.get('DISPLAY'):
+        yield True
+        return
+    xvfb = shutil.which('Xvfb')
+    if xvfb is None:
+        yield None
+        return
+    display = ':99'
+    process = subprocess.Popen([xvfb, display, '-screen', '0', '1280x1024x24'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ['DISPLAY'] = display
+    time.sleep(0.5)  # 서버가 뜰 때까지 대기
+    try:
+        yield True
+    finally:
+        del os.environ['DISPLAY']
+        process.terminate()
+        process.wait()
+
+
+def open_tk():
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        return None
+    root.withdraw()
+    return root
+
+
+def bench_treeview(root, result, repeat):
+    """결과 표 처음 채우기와 한 행만 바뀐 결과 다시 그리기 시간"""
+    from tkinter import ttk
+
+    from tree_render import TreeTable
+
+    rows = [((i, t1, t2), (kind,) if kind != ROW_PAIR else ())
+            for i, t1, t2, kind in result.pairing_rows()]
+    changed = list(rows)
+    values, tags = changed[0]
+    changed[0] = ((values[0], values[1] + '변경', values[2]), tags)
+
+    trees = []
+
+    def new_table():
+        for tree in trees:
+            tree.destroy()
+        trees[:] = [ttk.Treeview(root, columns=('No.', '팀1', '팀2'), show='headings')]
+        return TreeTable(trees[0])
+
+    def render(table):
+        table.render(rows)
+        root.update_idletasks()
+
+    def rendered_table():
+        table = new_table()
+        render(table)
+        return table
+
+    def rerender(table):
+        table.render(changed)
+        root.update_idletasks()
+
+    timings = (best_of(repeat, render, new_table),
+               best_of(repeat, rerender, rendered_table))
+    for tree in trees:
+        tree.destroy()
+    return timings
+
+
+# --- Notion ---
+
+def bench_payload(result, repeat):
+    """테이블 행 요청 본문 생성 시간 (전송하지 않음)"""
+    def build():
+        with contextlib.redirect_stdout(io.StringIO()):
+            importer = AsyncExcelToNotionImporter(
+                'token', 'parent', 'template', result=result, notion=StandInClient())
+            importer._table_rows('pairing')
+            importer._table_rows('teams')
+
+    return best_of(repeat, build)
+
+
+def bench_upload(result, repeat):
+    """메모리 대역에 템플릿 복제와 테이블 채우기 전체 실행 시간
+
+    대역은 지연 없이 응답하고 스케줄러 속도 제한도 풀어 두므로
+    네트워크가 아닌 업로더 자체의 처리 시간을 잰다.
+    """
+    def setup():
+        store = NotionStore()
+        parent_id, template_id = add_template(store)
+        return store, parent_id, template_id
+
+    def upload(args):
+        store, parent_id, template_id = args
+
+        async def run():
+            importer = AsyncExcelToNotionImporter(
+                'token', parent_id, template_id, result=result,
+                notion=StandInClient(store),
+                scheduler=RequestScheduler(rate=1e6, burst=1000, max_concurrency=10))
+            await importer.duplicate_template_page()
+            await importer.update_block()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(run())
+
+    return best_of(repeat, upload, setup)
+
+
+# --- 실행 ---
+
+def bench_size(players, repeat, tk_root, workdir):
+    session = make_session(players)
+    roster = RosterIndex(session.groups_data)
+    timings = {}
+
+    timings['tokenize'] = best_of(repeat, lambda: (
+        tokenize(session.jielong_text), tokenize(session.lesson_text)))
+    names = [entry.name for entry in tokenize(session.jielong_text)]
+    lessons = lesson_names(tokenize(session.lesson_text))
+
+    timings['order'] = best_of(repeat, lambda: order_attendees(names, roster))
+    ordered = order_attendees(names, roster)
+    timings['pairing'] = best_of(repeat, lambda: pairing(ordered, lessons))
+    timings['grouping'] = best_of(repeat, lambda: group_attendees(names, roster))
+    timings['generate_teams'] = best_of(repeat, lambda: generate_teams(
+        session.jielong_text, session.lesson_text, roster))
+
+    result = generate_teams(session.jielong_text, session.lesson_text, roster)
+
+    if tk_root is not None:
+        timings['treeview'], timings['treeview_update'] = bench_treeview(tk_root, result, repeat)
+
+    xlsx_path = os.path.join(workdir, f'session_{players}.xlsx')
+    timings['export_xlsx'] = best_of(repeat, lambda: export_xlsx(result, xlsx_path, 'csv'))
+    timings['payload'] = bench_payload(result, repeat)
+    timings['upload'] = bench_upload(result, repeat)
+    return timings
+
+
+def run(sizes, repeat):
+    results = {}
+    with virtual_display() as display, tempfile.TemporaryDirectory() as workdir:
+        tk_root = open_tk() if display else None
+        if tk_root is None:
+            print("화면을 열 수 없어 treeview 단계는 건너뜁니다")
+        try:
+            for players in sizes:
+                results[str(players)] = bench_size(players, repeat, tk_root, workdir)
+                print_timings(players, results[str(players)])
+        finally:
+            if tk_root is not None:
+                tk_root.destroy()
+    return {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def print_timings(players, timings):
+    print(f"[{players}명]")
+    for stage, seconds in timings.items():
+        print(f"  {stage:16s} {seconds * 1000:10.2f} ms")
+
+
+def find_regressions(report, baseline, threshold):
+    """[(인원, 단계, 이전 초, 현재 초), ...] 이전 결과보다 threshold배 넘게 느려진 단계"""
+    regressions = []
+    for players, timings in report['results'].items():
+        old_timings = baseline.get('results', {}).get(players, {})
+        for stage, seconds in timings.items():
+            old = old_timings.get(stage)
+            if old is None:
+                continue
+            if seconds > old * threshold and seconds - old > MIN_REGRESSION_SECONDS:
+                regressions.append((players, stage, old, seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description="단계별 성능 측정")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="참가자 수 목록 (기본값: 30 100 1000 10000)")
+    parser.add_argument('-r', '--repeat', type=int, default=5, help="단계별 반복 횟수 (기본값: 5)")
+    parser.add_argument('-o', '--output', help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument('--baseline', help="비교할 이전 결과 JSON 파일")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="이전보다 이 배수 넘게 느려지면 회귀로 표시 (기본값: 1.25)")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.repeat)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.threshold)
+        for players, stage, old, new in regressions:
+            print(f"[회귀] {players}명 {stage}: {old * 1000:.2f} ms → {new * 1000:.2f} ms "
+                  f"({new / old:.2f}배)", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"회귀 없음 (기준: {args.baseline}, {args.threshold}배)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
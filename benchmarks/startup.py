@@ -0,0 +1,84 @@
+"""앱 시작 시간 측정
+
+사용법:
+    python -m benchmarks.startup [-n RUNS] [--json PATH]
+
+매 실행마다 새 파이썬 프로세스를 띄워 다음을 측정하고 중앙값을 출력한다.
+
+- import: smash_tkinter 모듈을 불러오는 시간
+- first_paint: 모듈 import부터 창이 처음 그려질 때까지의 시간 (화면이 있을 때만)
+- process: 프로세스 시작부터 종료까지 걸린 전체 시간
+
+첫 화면 측정은 실제 설정 폴더(~/Documents/SmashTeamGenerator)를 사용한다.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 새 프로세스에서 실행할 측정 코드 (결과는 JSON 한 줄로 출력)
+CHILD_CODE = r"""
+import json, time
+t0 = time.perf_counter()
+import smash_tkinter
+t1 = time.perf_counter()
+result = {'import': t1 - t0}
+try:
+    app = smash_tkinter.SmashTeamGenerator()
+except Exception:
+    app = None  # 화면(DISPLAY)이 없는 환경
+if app is not None:
+    app.update()
+    result['first_paint'] = time.perf_counter() - t0
+    app.destroy()
+print(json.dumps(result))
+"""
+
+
+def measure_once():
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-c', CHILD_CODE], cwd=ROOT,
+        capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - started
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['process'] = elapsed
+    return result
+
+
+def measure(runs):
+    """runs번 측정해 항목별 중앙값(초) 반환"""
+    samples = [measure_once() for _ in range(runs)]
+    keys = sorted({key for sample in samples for key in sample})
+    return {
+        key: statistics.median(sample[key] for sample in samples if key in sample)
+        for key in keys
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="앱 시작 시간 측정")
+    parser.add_argument('-n', '--runs', type=int, default=5, help="측정 횟수 (기본값: 5)")
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args(argv)
+
+    result = measure(args.runs)
+    for key, seconds in result.items():
+        print(f"{key:12s} {seconds * 1000:8.1f} ms")
+    if 'first_paint' not in result:
+        print("화면이 없어 first_paint는 측정하지 않았습니다")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'runs': args.runs, 'median_seconds': result}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""벤치마크용 가상 로스터와 接龙/레슨 텍스트 생성기
+
+같은 seed에서는 항상 같은 데이터를 만든다. 이름은 토크나이저가 인식하는
+한글 이름 형식이고, 일부 참가자는 "게스트 (이름)" 형식으로 들어간다.
+"""
+import random
+
+from team_engine import GROUP_NAMES
+
+
+SURNAMES = '김이박최정강조윤장임한오서신권황안송류홍'
+SYLLABLES = '민서지현준우도윤하은수영호진성동혜경석원태연승주재상'
+GUEST_RATIO = 0.05   # 참가자 중 게스트 비율
+LESSON_RATIO = 0.1   # 참가자 중 레슨 인원 비율
+ROSTER_SLACK = 1.2   # 로스터 인원 / 참가자 수 (불참 멤버 포함)
+
+
+def make_names(count, rng):
+    """서로 다른 한글 이름 count개"""
+    total = len(SURNAMES) * len(SYLLABLES) ** 2
+    if count > total:
+        raise ValueError(f"이름은 최대 {total}개까지 만들 수 있습니다")
+    names = []
+    for code in rng.sample(range(total), count):
+        code, last = divmod(code, len(SYLLABLES))
+        surname, middle = divmod(code, len(SYLLABLES))
+        names.append(SURNAMES[surname] + SYLLABLES[middle] + SYLLABLES[last])
+    return names
+
+
+class Session:
+    """가상 세션 하나 (groups.yaml 데이터, 接龙 텍스트, 레슨 텍스트, 참가자 명단)"""
+
+    def __init__(self, groups_data, jielong_text, lesson_text, attendees, lesson_names):
+        self.groups_data = groups_data
+        self.jielong_text = jielong_text
+        self.lesson_text = lesson_text
+        self.attendees = attendees
+        self.lesson_names = lesson_names
+
+
+def make_session(players, seed=0):
+    """참가자 players명 규모의 세션 생성"""
+    rng = random.Random(seed)
+    members = make_names(int(players * ROSTER_SLACK) + 1, rng)
+    guest_count = int(players * GUEST_RATIO)
+    guests = [f"게스트 ({name})" for name in members[:guest_count]]
+    regulars = members[guest_count:]
+
+    # 로스터: 정규 멤버와 게스트를 A/B/C 조에 나눠 담음
+    roster_names = regulars + guests
+    rng.shuffle(roster_names)
+    groups = {g: roster_names[i::len(GROUP_NAMES)] for i, g in enumerate(GROUP_NAMES)}
+
+    attendees = rng.sample(regulars, players - guest_count) + guests
+    rng.shuffle(attendees)
+    lesson_names = rng.sample(attendees, int(players * LESSON_RATIO))
+    lesson_names = [name for name in lesson_names if name not in guests]
+
+    return Session(
+        groups_data={'groups': groups},
+        jielong_text=make_jielong(attendees, rng),
+        lesson_text=make_jielong(lesson_names, rng, coach=True) if lesson_names else '',
+        attendees=attendees,
+        lesson_names=lesson_names,
+    )
+
+
+def make_jielong(names, rng, coach=False, noise_lines=3):
+    """채팅방에 붙여넣은 것과 비슷한 接龙 텍스트
+
+    머리말과 잡담 줄이 섞이고, 앞쪽에는 같은 接龙의 이전(짧은) 목록이 한 번 더 들어간다.
+    coach가 True이면 첫 줄에 코치 표시를 붙인다.
+    """
+    lines = ["#接龙", "목요일 정기 운동 参加하실 분!", ""]
+    earlier = names[:max(1, len(names) // 2)]
+    for position, name in enumerate(earlier, start=1):
+        lines.append(f"{position}. {name}")
+    lines.extend(f"잡담 {i}" for i in range(noise_lines))
+
+    lines.extend(["", "#接龙", "목요일 정기 운동 参加하실 분!", ""])
+    for position, name in enumerate(names, start=1):
+        prefix = "코치 " if coach and position == 1 else ""
+        trailing = " " * rng.randint(0, 2)
+        lines.append(f"{position}. {prefix}{name}{trailing}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,142 @@
+"""로컬 Notion 대역 서버에 업로드 부하를 걸어 동시성과 재시도 동작 측정
+
+사용법:
+    python -m benchmarks.upload_load [--players 100] [--uploads 3] [--latency 0.1]
+        [--rate-limit 0.05] [--error-rate 0.02] [--applied-errors 0.5] [--rate 3]
+        [--max-concurrency 10] [--json PATH]
+
+benchmarks.fake_notion_server를 프로세스 안에서 띄우고, 실제 HTTP 경로
+(notion_client.AsyncClient + RequestScheduler)로 업로드 여러 개를 동시에 실행한다.
+업로드 시간, 서버가 받은 요청 수, 주입된 429/오류 수, 업로더가 재시도한 횟수,
+오류 응답을 받았지만 이미 반영된 것으로 확인한 쓰기 수, 만들어진 페이지 수를 출력한다.
+--applied-errors로 5xx 일부를 요청을 처리한 뒤에 돌려주면, 쓰기를 다시 보내기 전에
+반영 여부를 확인하는 동작을 측정할 수 있다 (페이지 수가 업로드 수보다 많으면 중복 생성).
+재시도 횟수를 넘겨 실패한 업로드가 있으면 실패 수와 오류 종류를 요약에 함께 출력하고
+1로 종료한다.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import sys
+import time
+from collections import Counter
+
+from notion_client import AsyncClient
+
+from excel_to_notion import AsyncExcelToNotionImporter, client_options
+from notion_scheduler import RequestScheduler
+from team_engine import generate_teams
+
+from benchmarks.fake_notion_server import FakeNotionServer, FaultInjector
+from benchmarks.notion_standin import add_template
+from benchmarks.synthetic import make_session
+
+
+async def run_uploads(base_url, parent_id, template_id, result, uploads, scheduler):
+    """업로드를 동시에 실행하고 ({'retry': 횟수, 'reconciled': 횟수}, 실패한 업로드의 예외 목록) 반환"""
+    events = {'retry': 0, 'reconciled': 0}
+
+    def count(event, info):
+        if event in events:
+            events[event] += 1
+
+    notion = AsyncClient(**client_options('token', base_url))
+    try:
+        importers = [
+            AsyncExcelToNotionImporter(
+                'token', parent_id, template_id, result=result,
+                notion=notion, scheduler=scheduler, progress=count)
+            for _ in range(uploads)
+        ]
+
+        async def upload(importer):
+            await importer.duplicate_template_page()
+            await importer.update_block()
+
+        results = await asyncio.gather(*(upload(importer) for importer in importers),
+                                       return_exceptions=True)
+    finally:
+        await notion.aclose()
+    return events, [result for result in results if isinstance(result, BaseException)]
+
+
+def measure(players=100, uploads=3, latency=0.1, jitter=0.0, rate_limit=0.0,
+            requests_per_second=None, error_rate=0.0, retry_after=1.0,
+            rate=3.0, max_concurrency=10, seed=0, applied_errors=0.0):
+    """업로드 uploads개를 동시에 실행한 결과 요약(dict) 반환"""
+    faults = FaultInjector(latency, jitter, rate_limit, requests_per_second,
+                           error_rate, retry_after, seed, applied_errors)
+    server = FakeNotionServer(faults=faults).start()
+    try:
+        parent_id, template_id = add_template(server.store)
+        session = make_session(players, seed)
+        result = generate_teams(session.jielong_text, session.lesson_text, session.groups_data)
+        scheduler = RequestScheduler(rate=rate, max_concurrency=max_concurrency)
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            events, failures = asyncio.run(run_uploads(
+                server.base_url, parent_id, template_id, result, uploads, scheduler))
+        elapsed = time.perf_counter() - started
+        pages = sum(1 for block in server.store.blocks.values()
+                    if block['type'] == 'page' and not block['archived']
+                    and block['parent'].get('page_id') == parent_id
+                    and block['id'] != template_id)
+    finally:
+        server.stop()
+
+    return {
+        'players': players,
+        'uploads': uploads,
+        'seconds': elapsed,
+        'server_requests': faults.counts['requests'],
+        'rate_limited': faults.counts['rate_limited'],
+        'errors': faults.counts['errors'],
+        'applied_errors': faults.counts['applied_errors'],
+        'retries': events['retry'],
+        'reconciled': events['reconciled'],
+        'pages_created': pages,
+        'failed_uploads': len(failures),
+        'failure_types': dict(Counter(type(error).__name__ for error in failures)),
+        'final_concurrency': scheduler.concurrency.limit,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.upload_load',
+                                     description="로컬 Notion 대역 서버 업로드 부하 측정")
+    parser.add_argument('--players', type=int, default=100, help="세션 인원 (기본값: 100)")
+    parser.add_argument('--uploads', type=int, default=3, help="동시에 실행할 업로드 수")
+    parser.add_argument('--latency', type=float, default=0.1, help="요청마다 더할 지연(초)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="지연에 더할 무작위 범위(초)")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="429 응답 비율 (0~1)")
+    parser.add_argument('--requests-per-second', type=float, default=None,
+                        help="서버가 초당 이보다 많은 요청을 429로 응답")
+    parser.add_argument('--retry-after', type=float, default=1.0,
+                        help="429 응답의 Retry-After(초)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="5xx 응답 비율 (0~1)")
+    parser.add_argument('--applied-errors', type=float, default=0.0,
+                        help="5xx 중 요청을 처리한 뒤에 돌려줄 비율 (0~1)")
+    parser.add_argument('--rate', type=float, default=3.0,
+                        help="업로더 스케줄러의 초당 요청 수 (기본값: 3)")
+    parser.add_argument('--max-concurrency', type=int, default=10, help="동시 요청 수 상한")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args(argv)
+
+    summary = measure(args.players, args.uploads, args.latency, args.jitter, args.rate_limit,
+                      args.requests_per_second, args.error_rate, args.retry_after,
+                      args.rate, args.max_concurrency, args.seed, args.applied_errors)
+    for key, value in summary.items():
+        print(f"{key:18s} {value:.2f}" if isinstance(value, float) else f"{key:18s} {value}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary['failed_uploads'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,41 +1,217 @@
 # import os
 # import time
-from dotenv import load_dotenv
-from notion_client import Client
-from datetime import datetime
+import asyncio
+import hashlib
+import importlib.util
+import json
+import re
+import threading
+import weakref
+import httpx
+from notion_client import APIResponseError, AsyncClient
+from datetime import date, datetime, timedelta, timezone
 from pprint import pprint
-import pandas as pd
-import concurrent.futures  # 병렬 처리를 위한 라이브러리 추가
+from notion_scheduler import RequestScheduler
+from notion_session_store import UploadJournal
+from team_engine import ROW_LESSON
+from tracing import record_response, span
 
 
-class ExcelToNotionImporter:
+# Notion API가 한 번에 주고받는 자식 블록 최대 수 (목록 조회, 블록 추가 모두)
+NOTION_PAGE_SIZE = 100
+
+# 여러 번 보내도 결과가 같은 엔드포인트 (시간 초과, 5xx 후에도 다시 보냄)
+# 블록 추가, 페이지 생성, 블록 삭제는 이미 반영되었을 수 있어, 시간 초과나 5xx 뒤에는
+# 반영되었는지 먼저 확인하고 반영되지 않은 경우만 다시 보낸다 (_api의 reconcile)
+IDEMPOTENT_ENDPOINTS = {
+    'blocks.children.list', 'blocks.retrieve', 'pages.retrieve', 'users.me',
+    'blocks.update',  # 같은 내용으로 덮어쓰므로 두 번 반영되어도 결과가 같음
+}
+
+# 같은 제목 페이지 생성을 프로세스 안에서 하나씩 하도록 하는 (이벤트 루프, 제목)별 잠금과
+# Notion 클라이언트별로 업로드가 만들었거나 이어서 쓰는 페이지 ID. 페이지 생성 요청이 응답
+# 없이 실패했을 때 같은 클라이언트로 진행 중인 다른 업로드의 같은 제목 페이지를 자기 것으로
+# 보지 않게 한다.
+_page_locks = {}
+_claimed_pages = weakref.WeakKeyDictionary()
+
+# 기본 정보 행에서 업로드가 채우는 인원 칸의 위치 (나머지 칸은 Notion에서 직접 적음)
+BASIC_INFO_PEOPLE_CELL = 2
+
+# 템플릿에 나오는 테이블 순서대로 붙인 역할 이름
+TABLE_ROLES = ('basic_info', 'pairing', 'teams')
+
+# 생성 요청에 자식 블록을 함께 담아야 하는 블록 종류 (빈 상태로 만들 수 없음)
+INLINE_CHILDREN_TYPES = {'table', 'column_list', 'column', 'synced_block'}
+
+
+# 페이지 제목의 요일 표기
+WEEKDAYS_KO = ("월", "화", "수", "목", "금", "토", "일")
+
+
+# 조편성 테이블의 컬럼별 배경색 (A, B, 나머지)
+TEAM_COLUMN_COLORS = ("green_background", "blue_background", "purple_background")
+
+
+def page_title(day):
+    """세션 날짜의 페이지 제목 (예: 25.3.1 (토))"""
+    return f"{day:%y}.{day.month}.{day.day} ({WEEKDAYS_KO[day.weekday()]})"
+
+
+def _annotations(color):
+    return {
+        "bold": False, "code": False, "color": color,
+        "italic": False, "strikethrough": False, "underline": False
+    }
+
+
+def _text_cell(content, annotations=None):
+    """테이블 셀 하나 (annotations 객체는 여러 셀이 공유해도 됨)"""
+    text_obj = {"type": "text", "text": {"content": content}}
+    if annotations is not None:
+        text_obj["annotations"] = annotations
+    return [text_obj]
+
+
+def _table_row(cells):
+    return {"object": "block", "type": "table_row", "table_row": {"cells": cells}}
+
+
+def _writable_cell(cell):
+    """조회한 셀의 rich text를 다시 보낼 수 있는 형식으로 (plain_text 등 읽기 전용 값 제외)"""
+    return [{key: item[key] for key in ('type', item['type'], 'annotations') if key in item}
+            for item in cell]
+
+
+def _cell_matrix(df):
+    """DataFrame을 셀 문자열 행 목록으로 변환 (빈 값은 "")"""
+    return df.astype(object).where(df.notna(), "").astype(str).to_numpy().tolist()
+
+
+def _row_digest(row):
+    """table_row 블록 내용의 요약값 (다시 업로드할 때 바뀐 행 찾기용)"""
+    cells = json.dumps(row['table_row']['cells'], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(cells.encode('utf-8')).hexdigest()[:16]
+
+
+def _blocks_digest(blocks):
+    """복사할 템플릿 블록 트리의 요약값 (이어서 복사할 수 있는지 확인용)"""
+    data = json.dumps(blocks, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()[:16]
+
+
+def _page_url(page_id):
+    return f"https://notion.so/{page_id.replace('-', '')}"
+
+
+def _children_of(block):
+    return block[block['type']].get('children') or []
+
+
+def _contains_table(block):
+    return any(child['type'] == 'table' or _contains_table(child)
+               for child in _children_of(block))
+
+
+def _endpoint_name(method):
+    """API 메서드의 span 이름 (예: BlocksChildrenEndpoint.list → blocks.children.list)"""
+    owner = getattr(method, '__self__', None)
+    name = getattr(method, '__name__', None)
+    if owner is None or name is None:
+        return getattr(method, 'endpoint', None) or repr(method)
+    words = re.findall(r'[A-Z][a-z]*', type(owner).__name__.replace('Endpoint', ''))
+    return '.'.join([word.lower() for word in words] + [name])
+
+
+def client_options(notion_token, base_url=None):
+    """notion_client.AsyncClient 생성 옵션 (base_url이 없으면 실제 Notion API)"""
+    options = {'auth': notion_token}
+    if base_url:
+        options['base_url'] = base_url.rstrip('/')
+    return options
+
+
+class UploadCancelled(Exception):
+    """업로드가 취소되어 더 이상 API를 호출하지 않을 때 발생"""
+
+
+class SessionPageMissing(Exception):
+    """이전에 업로드한 세션 페이지가 삭제되었거나 휴지통에 있을 때 발생"""
+
+
+class AsyncExcelToNotionImporter:
+    """AsyncClient 기반 Notion 업로더
+
+    템플릿 읽기, 페이지 생성, 테이블 추가를 모두 코루틴으로 실행하고
+    모든 요청은 RequestScheduler를 거쳐 속도 제한, 재시도, 동시 요청 수 조절을 받는다.
+    """
+
     def __init__(self, notion_token, parent_page_id, template_page_id, excel_file_path=None, lesson_indices=None,
-                 max_workers=3, use_concurrent=True):
+                 max_concurrency=10, traversal_concurrency=None, template_cache=None,
+                 scheduler=None, notion=None, result=None, base_url=None,
+                 progress=None, cancel_event=None, journal=None, session_date=None,
+                 template_reader=None):
         # 토큰 및 페이지 ID 설정
         self.NOTION_TOKEN = notion_token
         self.parent_page_id = parent_page_id
         self.template_page_id = template_page_id
-        self.table_id_list = []
+        self.tables = {}  # 역할 이름(TABLE_ROLES) → 새 페이지의 테이블 블록 ID
+        self.rows = {}  # 역할 이름 → 추가한 행 [[행 블록 ID, 내용 요약값], ...]
+        self.headers = {}  # 역할 이름 → 템플릿에서 복사한 머리글 행 수
+        self._table_roles = {}  # 복사 중인 템플릿 테이블 블록(id()) → 역할 이름
         self.lesson_indices = lesson_indices or []
         self.total_people = 0
+        self.new_page_id = None
+        # 페이지 제목에 쓸 세션 날짜 (datetime.date, 없으면 오늘)
+        self.session_date = session_date
         # excel 관련
         self.excel_file_path = excel_file_path
-        self.excel_data = None
+        self.excel_data = None  # 시트 이름('pairing', 'teams') → 셀 문자열 행 목록
+
+        # 요청 스케줄러 (여러 업로더가 공유 가능, max_concurrency는 동시 요청 수 상한)
+        self.max_concurrency = max_concurrency
+        self.scheduler = scheduler or RequestScheduler(
+            min_concurrency=min(2, max_concurrency), max_concurrency=max_concurrency)
+        # 블록 트리 탐색 시 한 단계에서 동시에 조회할 블록 수 (기본값: max_concurrency)
+        self.traversal_concurrency = traversal_concurrency or max_concurrency
+        # 가공된 템플릿 블록 트리 캐시 (notion_template_cache.TemplateCache, 선택)
+        self.template_cache = template_cache
+        # 템플릿 블록을 대신 읽어 주는 코루틴 함수 (여러 세션이 템플릿 읽기를 공유할 때, 선택)
+        self.template_reader = template_reader
 
-        # 성능 최적화 관련 파라미터
-        self.max_workers = max_workers  # 병렬 작업자 수
-        self.use_concurrent = use_concurrent  # 병렬 처리 사용 여부
+        # 진행 상황 콜백 progress(event, info)와 취소 이벤트(threading.Event)
+        # 콜백은 업로드를 실행하는 스레드에서 호출되므로 UI는 큐 등을 거쳐 반영해야 한다
+        self.progress = progress
+        self.cancel_event = cancel_event
+        # 단계별 진행 기록 (notion_session_store.UploadJournal, 선택)
+        # 기록이 남아 있으면 끝난 단계는 건너뛰고 이어서 업로드
+        self.journal = journal
 
-        # Excel 데이터 로드 (파일 경로가 제공된 경우)
-        if excel_file_path:
+        # 팀 생성 결과를 직접 받으면 파일을 거치지 않고 사용, 아니면 Excel 파일에서 로드
+        if result is not None:
+            self.load_result(result)
+        elif excel_file_path:
             self.load_excel_data()
 
-        # Notion 클라이언트 초기화
-        self.notion = Client(auth=self.NOTION_TOKEN)
+        # Notion 클라이언트 초기화 (공유 클라이언트를 받으면 닫지 않음)
+        self._owns_client = notion is None
+        # base_url을 주면 api.notion.com 대신 그 주소로 요청 (로컬 대역 서버 등)
+        self.notion = notion or AsyncClient(**client_options(self.NOTION_TOKEN, base_url))
+        if notion is None:
+            # 요청 span에 상태 코드와 바이트 수를 기록
+            self.notion.client.event_hooks = {'response': [record_response]}
+
+    async def aclose(self):
+        """HTTP 연결 정리"""
+        if self._owns_client:
+            await self.notion.aclose()
 
     def load_excel_data(self):
         """Excel 파일에서 데이터를 읽어오는 함수"""
         try:
+            # pandas는 Excel 파일을 읽을 때만 필요하므로 여기서 불러옴 (앱 시작 속도)
+            import pandas as pd
+
             # 페어링과 조편성 시트 모두 로드
             self.excel_data = {
                 'pairing': pd.read_excel(self.excel_file_path, sheet_name='페어링'),
@@ -43,30 +219,219 @@ class ExcelToNotionImporter:
             }
             print(
                 f"Excel 데이터 로드 완료: 페어링 {self.excel_data['pairing'].shape[0]}행, 조편성 {self.excel_data['teams'].shape[0]}행")
-            # 총인원 계산
-            for _, row in self.excel_data['pairing'].iterrows():
-                # t1과 t2 컬럼에서 비어있지 않은 값의 수를 더함
-                if not pd.isna(row['t1']) and row['t1'] != "":
-                    self.total_people += 1
-                if not pd.isna(row['t2']) and row['t2'] != "":
-                    self.total_people += 1
+            # 총인원 계산 (t1과 t2 컬럼에서 비어있지 않은 값의 수)
+            names = self.excel_data['pairing'][['t1', 't2']]
+            self.total_people = int((names.notna() & names.ne("")).to_numpy().sum())
+            # 테이블에 넣을 셀 문자열 행으로 변환
+            self.excel_data = {sheet: _cell_matrix(df) for sheet, df in self.excel_data.items()}
         except Exception as e:
             print(f"Excel 데이터 로드 중 오류 발생: {e}")
             self.excel_data = None
 
-    def process_block(self, block):
-        """여러 child 블록 처리 (재귀 함수)"""
+    def load_result(self, result):
+        """팀 생성 결과(team_engine.TeamResult)를 테이블 데이터로 사용
+
+        pairs의 종류가 레슨인 행은 lesson_indices로 기록한다.
+        """
+        pairing = [[str(t1), str(t2)] for _, t1, t2, _ in result.pairing_rows()]
+        self.excel_data = {
+            'pairing': pairing,
+            'teams': [[str(cell) for cell in row[1:]] for row in result.group_rows()],
+        }
+        self.lesson_indices = [i for i, (_, _, _, kind) in enumerate(result.pairing_rows())
+                               if kind == ROW_LESSON]
+        self.total_people = sum(1 for row in pairing for name in row if name)
+        print(f"팀 생성 결과 로드 완료: 페어링 {len(pairing)}행, 조편성 {len(self.excel_data['teams'])}행")
+
+    def _lesson_mask(self, row_count):
+        """행 번호(0부터)별 레슨생 여부 목록"""
+        mask = [False] * row_count
+        for idx in self.lesson_indices:
+            if 0 <= idx < row_count:
+                mask[idx] = True
+        return mask
+
+    def _emit(self, event, **info):
+        """진행 상황 알림 (page_created, template_copied, table_filled, retry, reconciled)"""
+        if self.progress:
+            self.progress(event, info)
+
+    def _check_cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise UploadCancelled("업로드가 취소되었습니다")
+
+    def _on_retry(self, attempt, delay, error):
+        self._check_cancelled()
+        self._emit('retry', attempt=attempt, delay=delay, error=str(error))
+
+    async def _api(self, method, *args, reconcile=None, **kwargs):
+        """모든 Notion API 호출의 공통 경로 (스케줄러로 실행)
+
+        취소는 스케줄러에 들어갈 때, 순서를 기다린 뒤 보내기 직전, 재시도 대기 중에
+        확인하므로 취소 후에는 새 요청이 나가지 않는다.
+        reconcile은 쓰기 요청이 시간 초과나 5xx로 실패했을 때 이미 반영되었는지 확인하는
+        함수로, 반영되었으면 응답 대신 쓸 값을, 아니면 None을 돌려준다
+        (RequestScheduler.call 참고). 없으면 그런 쓰기 오류는 그대로 발생한다.
+        """
+        self._check_cancelled()
+        name = _endpoint_name(method)
+
+        async def checked_reconcile():
+            applied = await reconcile()
+            if applied is not None:
+                self._emit('reconciled', endpoint=name)
+            return applied
+
+        return await self.scheduler.call(
+            lambda: method(*args, **kwargs), on_retry=self._on_retry, name=name,
+            idempotent=name in IDEMPOTENT_ENDPOINTS, check=self._check_cancelled,
+            reconcile=checked_reconcile if reconcile is not None else None)
+
+    def _appended_children(self, block_id, position, count):
+        """추가 요청이 반영되었는지 확인하는 reconcile 함수
+
+        부모의 자식 목록을 다시 조회해 position 뒤에 count개가 더 있으면 반영된 것으로 보고
+        추가 응답과 같은 모양({'results': [...]})으로 돌려준다. 같은 부모에는 묶음을
+        차례로 보내므로 그사이 다른 추가 요청이 끼어들지 않는다.
+        """
+        async def reconcile():
+            existing = await self.list_all_children(block_id)
+            if len(existing) < position + count:
+                return None
+            return {'results': existing[position:position + count]}
+        return reconcile
+
+    async def _delete_block(self, block_id):
+        """블록 삭제 (실패한 요청이 이미 반영되었으면 다시 보내지 않음)"""
+        async def reconcile():
+            try:
+                block = await self._api(self.notion.blocks.retrieve, block_id)
+            except APIResponseError as e:
+                if e.code == 'object_not_found':
+                    return {'id': block_id, 'archived': True}
+                raise
+            return block if block.get('archived') or block.get('in_trash') else None
+
+        return await self._api(self.notion.blocks.delete, block_id, reconcile=reconcile)
+
+    async def list_all_children(self, block_id):
+        """next_cursor를 따라가며 block_id의 자식 블록 전체 조회"""
+        results = []
+        kwargs = {'page_size': NOTION_PAGE_SIZE}
+        while True:
+            response = await self._api(self.notion.blocks.children.list, block_id, **kwargs)
+            results.extend(response['results'])
+            if not response.get('has_more'):
+                return results
+            kwargs['start_cursor'] = response['next_cursor']
+
+    async def append_children(self, block_id, children, position=None):
+        """자식 블록을 API 한도(100개)씩 나눠 순서대로 추가, 생성된 블록 목록 반환
+
+        같은 부모에 대한 묶음들은 순서를 지키기 위해 차례로 보내고,
+        서로 다른 부모(테이블)에 대한 호출끼리는 호출하는 쪽에서 동시에 진행한다.
+        position은 추가하기 전 부모의 자식 수로, 주면 시간 초과나 5xx로 실패한 묶음이
+        반영되었는지 확인한 뒤 다시 보낸다 (_append_chunks 참고).
+        """
+        created = []
+        async for chunk_results in self._append_chunks(block_id, children, position):
+            created.extend(chunk_results)
+        return created
+
+    async def _append_chunks(self, block_id, children, position=None):
+        """묶음 하나를 추가할 때마다 그 응답의 생성된 블록 목록을 넘겨줌
+
+        position(추가 전 부모의 자식 수)을 모르면 반영 여부를 확인할 수 없으므로
+        시간 초과나 5xx로 실패한 묶음을 다시 보내지 않는다.
+        """
+        for start in range(0, len(children), NOTION_PAGE_SIZE):
+            chunk = children[start:start + NOTION_PAGE_SIZE]
+            reconcile = None
+            if position is not None:
+                reconcile = self._appended_children(block_id, position + start, len(chunk))
+            response = await self._api(
+                self.notion.blocks.children.append,
+                block_id=block_id,
+                children=chunk,
+                reconcile=reconcile
+            )
+            yield response['results']
+
+    async def _journaled_chunks(self, block_id, children, path):
+        """_append_chunks와 같지만 묶음마다 생성된 블록 ID를 저널에 기록
+
+        저널에 이미 기록된 묶음은 다시 보내지 않고 기록된 ID를 넘겨준다.
+        path는 템플릿 트리 안의 위치로, 같은 템플릿이면 업로드마다 같은 값이다.
+        """
+        if self.journal is None:
+            async for chunk_results in self._append_chunks(block_id, children, 0):
+                yield chunk_results
+            return
+
+        appended = self.journal.state.setdefault('appended', {})
+        existing = None
+        for index, start in enumerate(range(0, len(children), NOTION_PAGE_SIZE)):
+            key = f"{path}:{index}"
+            if key in appended:
+                yield [{'id': block_id} for block_id in appended[key]]
+                continue
+
+            chunk = children[start:start + NOTION_PAGE_SIZE]
+            if self.journal.resuming:
+                # 응답을 받기 전에 끊긴 추가 요청이 반영되었는지 부모의 자식 목록으로 확인
+                # (새로 만든 부모는 비어 있는 상태에서 이 함수로만 채우므로 위치가 일치)
+                if existing is None:
+                    existing = await self.list_all_children(block_id)
+                if len(existing) >= start + len(chunk):
+                    adopted = existing[start:start + len(chunk)]
+                    appended[key] = [created['id'] for created in adopted]
+                    self.journal.update()
+                    yield adopted
+                    continue
+
+            response = await self._api(
+                self.notion.blocks.children.append,
+                block_id=block_id,
+                children=chunk,
+                reconcile=self._appended_children(block_id, start, len(chunk))
+            )
+            appended[key] = [created['id'] for created in response['results']]
+            self.journal.update()
+            yield response['results']
+
+    async def fetch_block_tree(self, root_id, stop_at=()):
+        """root_id 아래 모든 블록을 단계별로 조회해 {부모 ID: [자식 블록, ...]} 반환
+
+        한 단계(깊이)의 자식 목록들을 동시에 가져온 뒤 다음 단계로 내려가므로
+        왕복 횟수는 컨테이너 블록 수가 아니라 트리 깊이에 비례한다.
+        stop_at에 있는 종류의 블록은 자식을 조회하지 않는다.
+        """
+        limit = asyncio.Semaphore(self.traversal_concurrency)
+
+        async def list_children(block_id):
+            async with limit:
+                return await self.list_all_children(block_id)
+
+        children = {}
+        level = [root_id]
+        while level:
+            results = await asyncio.gather(*(list_children(block_id) for block_id in level))
+            children.update(zip(level, results))
+            level = [child['id'] for blocks in results for child in blocks
+                     if child['has_children'] and child['type'] not in stop_at]
+        return children
+
+    def process_block(self, block, children):
+        """여러 child 블록 처리 (조회해 둔 트리로 원래 순서대로 재조립)"""
         block_type = block['type']
         block_id = block['id']
 
         # 자식 블록이 있는 경우
         if block['has_children']:
-            children_blocks = self.notion.blocks.children.list(block_id)[
-                'results']
             children_data = []
             # 각 자식 블록 처리
-            for child in children_blocks:
-                child_data = self.process_block(child)
+            for child in children.get(block_id, []):
+                child_data = self.process_block(child, children)
                 if child_data:
                     children_data.append(child_data)
 
@@ -85,214 +450,706 @@ class ExcelToNotionImporter:
                 block_type: block[block_type]
             }
 
-    def update_block(self):
-        """테이블 블록 업데이트 함수 (최적화 버전)"""
+    def _table_targets(self):
+        """채울 테이블 [(역할, 테이블 ID), ...] (데이터가 없는 시트의 테이블은 제외)"""
+        return [(role, table_id) for role, table_id in self.tables.items()
+                if role == 'basic_info' or role in self.excel_data]
 
-        def get_all_block(block):
-            """새로운 페이지에 있는 모든 블록 조회 & table_id_list 추가"""
-            block_id = block['id']
-            block_type = block['type']
-            if block_type == 'table':
-                self.table_id_list.append(block_id)
-
-            if block['has_children']:
-                children_blocks = self.notion.blocks.children.list(block_id)[
-                    'results']
-                for child in children_blocks:
-                    get_all_block(child)
-
-        # 모든 테이블 ID 가져오기
-        block_list = self.notion.blocks.children.list(self.new_page_id)
-        for block in block_list['results']:
-            get_all_block(block)
-
-        # 병렬 처리를 위한 함수 정의
-        def update_table(table_index):
-            table_id = self.table_id_list[table_index]
-            if table_index == 0:  # 기본 정보 테이블
-                return self._update_basic_info_table(table_id)
-            elif table_index == 1 and 'pairing' in self.excel_data:  # 페어링 테이블
-                return self._update_pairing_table(table_id)
-            elif table_index == 2 and 'teams' in self.excel_data:  # 조편성 테이블
-                return self._update_teams_table(table_id)
-            return None
+    async def update_block(self):
+        """테이블 블록 업데이트 함수 (복사 단계에서 기록한 테이블을 동시에 채움)"""
+        fillers = {
+            'basic_info': self._update_basic_info_table,
+            'pairing': self._update_pairing_table,
+            'teams': self._update_teams_table,
+        }
+        targets = self._table_targets()
+        filled_tables = []
 
-        # 병렬 처리 수행 (선택적)
-        if self.use_concurrent and len(self.table_id_list) > 1:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(self.table_id_list), self.max_workers)) as executor:
-                futures = [executor.submit(update_table, i)
-                           for i in range(len(self.table_id_list))]
-                concurrent.futures.wait(futures)
-        else:
-            # 순차 처리
-            for i in range(len(self.table_id_list)):
-                update_table(i)
+        async def update_table(role, table_id):
+            result = await fillers[role](table_id)
+            filled_tables.append(role)
+            self._emit('table_filled', done=len(filled_tables), total=len(targets))
+            return result
 
-    def _update_basic_info_table(self, table_id):
-        """기본 정보 테이블 업데이트"""
+        with span('fill_tables', 'upload', tables=len(targets)):
+            await asyncio.gather(*(update_table(role, table_id) for role, table_id in targets))
+
+    async def _append_rows(self, role, table_id, rows):
+        """행 블록을 테이블에 추가하고, 만들어진 행 블록 ID를 묶음마다 self.rows에 기록"""
+        recorded = self.rows.setdefault(role, [])
+        position = self.headers.get(role, 0) + len(recorded)
+        done = 0
+        async for chunk_results in self._append_chunks(table_id, rows, position):
+            recorded.extend([created['id'], _row_digest(row)]
+                            for created, row in zip(chunk_results, rows[done:]))
+            done += len(chunk_results)
+            self._checkpoint()
+
+    async def _fill_table(self, role, table_id, rows):
+        """테이블을 rows로 채움 (이어서 올리는 중이면 이미 추가한 행은 건너뜀)"""
+        recorded = self.rows.setdefault(role, [])
+        if self.journal is not None and self.journal.resuming and len(recorded) < len(rows):
+            await self._reconcile_rows(role, table_id, rows)
+        await self._append_rows(role, table_id, rows[len(recorded):])
+
+    async def _reconcile_rows(self, role, table_id, rows):
+        """저널에 없지만 테이블에 들어간 행(응답을 받기 전에 끊긴 추가 요청)을 찾아 기록
+
+        그런 행을 다시 추가하면 같은 행이 두 번 들어가므로, 테이블의 실제 행을 한 번
+        조회해 기록된 행 뒤에 더 있는 만큼을 추가된 것으로 본다.
+        """
+        recorded = self.rows[role]
+        existing = await self.list_all_children(table_id)
+        written = existing[self.headers.get(role, 0):]
+        for block, row in zip(written[len(recorded):], rows[len(recorded):]):
+            recorded.append([block['id'], _row_digest(row)])
+
+    def _table_rows(self, role):
+        """역할별 테이블에 넣을 행 블록 목록"""
+        builders = {
+            'basic_info': self._basic_info_rows,
+            'pairing': self._pairing_rows,
+            'teams': self._teams_rows,
+        }
+        return builders[role]()
+
+    def _basic_info_rows(self):
         basic_info = ["", "", self.total_people, "21:00-23:00"]
-        cells = []
-        for cell_value in basic_info:
-            cell = [{
-                "type": "text",
-                "text": {"content": str(cell_value)},
-                "annotations": {
-                    "bold": False, "code": False, "color": "default",
-                    "italic": False, "strikethrough": False, "underline": False
-                }
-            }]
-            cells.append(cell)
+        annotations = _annotations("default")
+        cells = [_text_cell(str(cell_value), annotations) for cell_value in basic_info]
+        return [_table_row(cells)]
 
-        self.notion.blocks.children.append(
-            block_id=table_id,
-            children=[{
-                "object": "block",
-                "type": "table_row",
-                "table_row": {"cells": cells}
-            }]
-        )
+    async def _update_basic_info_table(self, table_id):
+        """기본 정보 테이블 업데이트"""
+        await self._fill_table('basic_info', table_id, self._basic_info_rows())
         return "basic_info_updated"
 
-    def _update_pairing_table(self, table_id):
+    async def _update_pairing_table(self, table_id):
         """페어링 테이블 업데이트"""
-        df = self.excel_data['pairing']
-        columns = df.columns.tolist()
-        print(f"페어링 시트 데이터 추가 중... (총 {len(df)}행)")
-
-        all_rows = []
-        for idx, row in df.iterrows():
-            cells = []
-            # 인덱스 (1부터 시작)
-            cells.append([{"type": "text", "text": {"content": str(idx + 1)}}])
-
-            # 레슨생 여부 확인
-            is_lesson = idx in self.lesson_indices
-
-            # 컬럼 데이터 추가
-            for col in columns:
-                cell_value = str(row[col]) if not pd.isna(row[col]) else ""
-
-                # 레슨생인 경우 노랑색 배경 적용
-                text_obj = {
-                    "type": "text",
-                    "text": {"content": cell_value}
-                }
+        rows = self.excel_data['pairing']
+        print(f"페어링 시트 데이터 추가 중... (총 {len(rows)}행)")
 
-                if is_lesson:
-                    text_obj["annotations"] = {
-                        "bold": False, "code": False, "color": "yellow_background",
-                        "italic": False, "strikethrough": False, "underline": False
-                    }
+        # API 한도에 맞춰 나눠서 추가
+        await self._fill_table('pairing', table_id, self._pairing_rows())
+        print(f"페어링 테이블 업데이트 완료 ({len(rows)} 행 추가)")
+        return "pairing_updated"
 
-                cells.append([text_obj])
+    def _pairing_rows(self):
+        rows = self.excel_data['pairing']
+        with span('build_rows', table='pairing', rows=len(rows)):
+            # 레슨생 행 표시 (행마다 목록을 찾지 않도록 미리 계산), 레슨생은 노랑색 배경
+            lesson_mask = self._lesson_mask(len(rows))
+            lesson = _annotations("yellow_background")
 
-            all_rows.append({
-                "object": "block",
-                "type": "table_row",
-                "table_row": {"cells": cells}
-            })
-
-        # 한 번에 모든 행 추가
-        self.notion.blocks.children.append(
-            block_id=table_id,
-            children=all_rows
-        )
-        print(f"페어링 테이블 업데이트 완료 ({len(df)} 행 추가)")
-        return "pairing_updated"
+            # 인덱스(1부터 시작) + 컬럼 데이터
+            all_rows = [
+                _table_row([_text_cell(str(idx))] + [
+                    _text_cell(cell_value, lesson if is_lesson else None) for cell_value in row])
+                for idx, (row, is_lesson) in enumerate(zip(rows, lesson_mask), start=1)
+            ]
+        return all_rows
 
-    def _update_teams_table(self, table_id):
+    async def _update_teams_table(self, table_id):
         """조편성 테이블 업데이트"""
-        df = self.excel_data['teams']
-        columns = df.columns.tolist()
-        print(f"조편성 시트 데이터 추가 중... (총 {len(df)}행)")
-
-        all_rows = []
-        for idx, row in df.iterrows():
-            cells = []
-            # 인덱스 (1부터 시작)
-            cells.append([{"type": "text", "text": {"content": str(idx + 1)}}])
-
-            # 컬럼 데이터 추가 (배경색 지정)
-            for col_idx, col in enumerate(columns):
-                cell_value = str(row[col]) if not pd.isna(row[col]) else ""
-
-                # 컬럼 순서에 따라 다른 배경색 적용
-                if col_idx == 0:
-                    bg_color = "green_background"
-                elif col_idx == 1:
-                    bg_color = "blue_background"
-                else:
-                    bg_color = "purple_background"
-
-                cells.append([{
-                    "type": "text",
-                    "text": {"content": cell_value},
-                    "annotations": {
-                        "bold": False, "code": False, "color": bg_color,
-                        "italic": False, "strikethrough": False, "underline": False
-                    }
-                }])
+        rows = self.excel_data['teams']
+        print(f"조편성 시트 데이터 추가 중... (총 {len(rows)}행)")
 
-            all_rows.append({
-                "object": "block",
-                "type": "table_row",
-                "table_row": {"cells": cells}
-            })
-
-        # 한 번에 모든 행 추가
-        self.notion.blocks.children.append(
-            block_id=table_id,
-            children=all_rows
-        )
-        print(f"조편성 테이블 업데이트 완료 ({len(df)} 행 추가)")
+        # API 한도에 맞춰 나눠서 추가
+        await self._fill_table('teams', table_id, self._teams_rows())
+        print(f"조편성 테이블 업데이트 완료 ({len(rows)} 행 추가)")
         return "teams_updated"
 
-    def duplicate_template_page(self):
-        # 페이지 생성 로직
-        today = datetime.now()
-        weekday_ko = ["월", "화", "수", "목", "금", "토", "일"]
-        formatted_date = f"{today:%y}.{today.month}.{today.day} ({weekday_ko[today.weekday()]})"
-
-        new_page = self.notion.pages.create(
-            parent={
-                "type": "page_id",
-                "page_id": self.parent_page_id
-            },
-            properties={
-                "title": {
-                    "title": [
-                        {
-                            "text": {"content": formatted_date}
-                        }
-                    ]
+    def _teams_rows(self):
+        rows = self.excel_data['teams']
+        with span('build_rows', table='teams', rows=len(rows)):
+            # 컬럼 순서에 따라 다른 배경색 적용 (컬럼마다 한 번만 생성)
+            width = max((len(row) for row in rows), default=0)
+            column_annotations = [
+                _annotations(TEAM_COLUMN_COLORS[min(col_idx, len(TEAM_COLUMN_COLORS) - 1)])
+                for col_idx in range(width)
+            ]
+
+            # 인덱스(1부터 시작) + 컬럼 데이터
+            all_rows = [
+                _table_row([_text_cell(str(idx))] + [
+                    _text_cell(cell_value, annotations)
+                    for cell_value, annotations in zip(row, column_annotations)])
+                for idx, row in enumerate(rows, start=1)
+            ]
+        return all_rows
+
+    def session_state(self):
+        """다음 업로드 때 바뀐 행만 갱신하기 위한 상태 (notion_session_store에 저장)"""
+        return {
+            'page_id': self.new_page_id,
+            'page_url': _page_url(self.new_page_id),
+            'parent_page_id': self.parent_page_id,
+            'template_page_id': self.template_page_id,
+            'tables': dict(self.tables),
+            'headers': dict(self.headers),
+            'rows': {role: [list(row) for row in rows] for role, rows in self.rows.items()},
+        }
+
+    def _checkpoint(self, **progress):
+        """지금까지 끝난 단계를 저널에 저장 (저널이 없거나 페이지가 아직 없으면 무시)"""
+        if self.journal is not None and self.new_page_id is not None:
+            self.journal.update(**self.session_state(), **progress)
+
+    async def _page_exists(self, page_id):
+        """페이지가 남아 있는지 확인 (삭제되었거나 휴지통에 있으면 False)"""
+        try:
+            page = await self._api(self.notion.pages.retrieve, page_id)
+        except APIResponseError as e:
+            if e.code == 'object_not_found':
+                return False
+            raise
+        return not (page.get('archived') or page.get('in_trash'))
+
+    async def sync_page(self, state):
+        """이전에 업로드한 페이지(session_state()의 값)에서 바뀐 행만 갱신하고 URL 반환
+
+        같은 위치의 행끼리 내용 요약값을 비교해 다른 행은 blocks.update로 고치고,
+        늘어난 행은 테이블 끝에 추가, 줄어든 행은 삭제한다. 이름 하나를 고치면
+        페이지 확인 1번과 행 수정 몇 번으로 끝난다. 기본 정보 행은 인원 칸만 고친다
+        (_sync_basic_info 참고).
+        페이지가 없거나 휴지통에 있으면 SessionPageMissing이 발생한다.
+        """
+        if not await self._page_exists(state['page_id']):
+            raise SessionPageMissing(state['page_id'])
+
+        self.new_page_id = state['page_id']
+        self._restore(state)
+        page_url = _page_url(self.new_page_id)
+
+        plans = [(role, table_id, self._table_rows(role))
+                 for role, table_id in self._table_targets()]
+        with span('sync_tables', 'upload', tables=len(plans)) as info:
+            counts = await asyncio.gather(*(self._sync_table(role, table_id, rows)
+                                            for role, table_id, rows in plans))
+            for key, value in zip(('updated', 'added', 'removed'),
+                                  (sum(column) for column in zip(*counts))):
+                info[key] = value
+        self._emit('page_synced', url=page_url, **{key: info.get(key, 0) for key in
+                                                   ('updated', 'added', 'removed')})
+        return page_url
+
+    async def _sync_table(self, role, table_id, rows):
+        """테이블 하나를 rows에 맞춰 갱신하고 (수정, 추가, 삭제) 행 수 반환
+
+        실패하거나 취소되어도 실제로 반영된 만큼 self.rows를 맞춰 둔다.
+        """
+        if role == 'basic_info':
+            return await self._sync_basic_info(rows)
+
+        recorded = self.rows.setdefault(role, [])
+        digests = [_row_digest(row) for row in rows]
+        changed = [i for i in range(min(len(recorded), len(rows)))
+                   if recorded[i][1] != digests[i]]
+        removed = recorded[len(rows):]
+        added = rows[len(recorded):]
+        deleted = set()
+
+        async def update(i):
+            await self._api(self.notion.blocks.update, recorded[i][0],
+                            table_row=rows[i]['table_row'])
+            recorded[i][1] = digests[i]
+
+        async def delete(row_id):
+            await self._delete_block(row_id)
+            deleted.add(row_id)
+
+        results = await asyncio.gather(
+            *(update(i) for i in changed),
+            *(delete(row_id) for row_id, _ in removed),
+            self._append_rows(role, table_id, added),
+            return_exceptions=True)
+        recorded[:] = [row for row in recorded if row[0] not in deleted]
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return len(changed), len(added), len(removed)
+
+    async def _sync_basic_info(self, rows):
+        """기본 정보 행의 인원 칸만 갱신하고 (수정, 추가, 삭제) 행 수 반환
+
+        장소, 코트 등은 업로드 뒤 Notion에서 직접 적는 칸이라 행 전체를 덮어쓰지 않는다.
+        인원이 바뀐 경우에만 행을 조회해 인원 칸만 바꿔 다시 쓰며, 행 추가와 삭제는
+        새 페이지를 만들 때만 한다.
+        """
+        recorded = self.rows.get('basic_info') or []
+        if not recorded or not rows:
+            return 0, 0, 0
+        row_id, digest = recorded[0]
+        new_digest = _row_digest(rows[0])
+        if digest == new_digest:
+            return 0, 0, 0
+
+        block = await self._api(self.notion.blocks.retrieve, row_id)
+        cells = [_writable_cell(cell) for cell in block['table_row']['cells']]
+        people_cell = rows[0]['table_row']['cells'][BASIC_INFO_PEOPLE_CELL]
+        cells.extend([] for _ in range(BASIC_INFO_PEOPLE_CELL + 1 - len(cells)))
+        cells[BASIC_INFO_PEOPLE_CELL] = people_cell
+        await self._api(self.notion.blocks.update, row_id, table_row={'cells': cells})
+        recorded[0][1] = new_digest
+        return 1, 0, 0
+
+    def _restore(self, state):
+        """저장된 상태(session_state()의 값)에서 테이블과 행 블록 ID 복원"""
+        self.tables = dict(state.get('tables', {}))
+        self.headers = dict(state.get('headers', {}))
+        self.rows = {role: [list(row) for row in rows]
+                     for role, rows in state.get('rows', {}).items()}
+
+    def _record_table(self, template_block, table_id):
+        role = self._table_roles.get(id(template_block))
+        if role:
+            self.tables[role] = table_id
+            self.headers[role] = len(_children_of(template_block))
+
+    async def _append_tree(self, parent_id, blocks, path='0'):
+        """blocks를 parent_id 아래에 추가하고, 응답으로 받은 ID로 하위 블록과 테이블 처리
+
+        빈 상태로 만들 수 있는 컨테이너는 자식 없이 먼저 만들고, 응답의 새 ID 아래에
+        자식을 이어서 추가한다. 자식과 함께 만들어야 하는 컨테이너(column_list 등)
+        안의 테이블만 해당 부분을 조회해 ID를 찾는다.
+        """
+        payload = []
+        deferred = []
+        for block in blocks:
+            block_type = block['type']
+            children = _children_of(block)
+            if children and block_type not in INLINE_CHILDREN_TYPES:
+                properties = {key: value for key, value in block[block_type].items()
+                              if key != 'children'}
+                payload.append({**block, block_type: properties})
+                deferred.append(children)
+            else:
+                payload.append(block)
+                deferred.append(None)
+
+        # 묶음 응답이 올 때마다 하위 작업을 시작해 다음 묶음 추가와 겹치게 함
+        tasks = []
+        position = 0
+        try:
+            async for chunk_results in self._journaled_chunks(parent_id, payload, path):
+                for created in chunk_results:
+                    block, children = blocks[position], deferred[position]
+                    if block['type'] == 'table':
+                        self._record_table(block, created['id'])
+                    elif children:
+                        tasks.append(asyncio.ensure_future(
+                            self._append_tree(created['id'], children, f"{path}.{position}")))
+                    elif _contains_table(block):
+                        tasks.append(asyncio.ensure_future(
+                            self._locate_inline_tables(block, created['id'])))
+                    position += 1
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        await asyncio.gather(*tasks)
+
+    async def _locate_inline_tables(self, template_block, block_id):
+        """자식과 함께 만든 컨테이너 안의 테이블 ID를 템플릿 구조와 맞춰 기록"""
+        children = await self.fetch_block_tree(block_id, stop_at=('table',))
+
+        def match(template_children, created_children):
+            for template_child, created in zip(template_children, created_children):
+                if template_child['type'] == 'table':
+                    self._record_table(template_child, created['id'])
+                elif _contains_table(template_child):
+                    match(_children_of(template_child), children.get(created['id'], []))
+
+        match(_children_of(template_block), children.get(block_id, []))
+
+    async def _read_template(self):
+        """템플릿 페이지 child 블록을 복사 가능한 형태로 가져오기
+
+        캐시가 있으면 페이지 메타데이터만 조회해 last_edited_time이 같을 때 캐시를 쓴다.
+        template_reader가 있으면 그 결과를 그대로 쓴다.
+        """
+        if self.template_reader is not None:
+            return await self.template_reader()
+
+        with span('read_template', 'upload') as info:
+            last_edited_time = None
+            if self.template_cache is not None:
+                page = await self._api(self.notion.pages.retrieve, self.template_page_id)
+                last_edited_time = page['last_edited_time']
+                cached = self.template_cache.load(self.template_page_id, last_edited_time)
+                info['cached'] = cached is not None
+                if cached is not None:
+                    return cached
+
+            children = await self.fetch_block_tree(self.template_page_id)
+            processed = [self.process_block(block, children)
+                         for block in children[self.template_page_id]]
+            all_blocks = [block for block in processed if block]
+
+            if self.template_cache is not None:
+                self.template_cache.save(self.template_page_id, last_edited_time, all_blocks)
+            return all_blocks
+
+    async def _find_created_page(self, title, since):
+        """부모 페이지 아래에서 since(ISO 시각) 이후 만들어진 title 페이지 찾기 (없으면 None)
+
+        페이지 생성 요청이 응답 없이 실패했을 때 다시 만들기 전에 확인하는 용도다.
+        """
+        found = None
+        for block in await self.list_all_children(self.parent_page_id):
+            if (block.get('type') == 'child_page' and not block.get('archived')
+                    and block['id'] not in _claimed_pages.get(self.notion, ())
+                    and block['child_page'].get('title') == title
+                    and block.get('created_time', '') >= since):
+                found = {'id': block['id']}
+        return found
+
+    async def _create_page(self):
+        # 페이지 생성 로직 (제목은 세션 날짜)
+        formatted_date = page_title(self.session_date or date.today())
+        # Notion의 created_time은 분 단위이므로 보낸 시각의 분에서 시계 차이 1분을 더 뺀 시각
+        since = (datetime.now(timezone.utc) - timedelta(minutes=1)).strftime(
+            '%Y-%m-%dT%H:%M:00.000Z')
+
+        lock = _page_locks.setdefault((asyncio.get_running_loop(), formatted_date),
+                                      asyncio.Lock())
+        async with lock:
+            new_page = await self._api(
+                self.notion.pages.create,
+                reconcile=lambda: self._find_created_page(formatted_date, since),
+                parent={
+                    "type": "page_id",
+                    "page_id": self.parent_page_id
+                },
+                properties={
+                    "title": {
+                        "title": [
+                            {
+                                "text": {"content": formatted_date}
+                            }
+                        ]
+                    }
                 }
-            }
-        )
+            )
+            _claimed_pages.setdefault(self.notion, set()).add(new_page['id'])
         self.new_page_id = new_page['id']
+        new_page_url = _page_url(self.new_page_id)
+        self._checkpoint()
+        self._emit('page_created', url=new_page_url)
+        return new_page_url
+
+    async def _resume_page(self):
+        """저널에 기록된 페이지가 남아 있으면 이어서 쓰고 URL 반환
+
+        기록이 없거나 페이지가 지워졌으면 저널을 비우고 새 페이지를 만든다.
+        """
+        page_id = self.journal.state.get('page_id') if self.journal is not None else None
+        if page_id:
+            if await self._page_exists(page_id):
+                _claimed_pages.setdefault(self.notion, set()).add(page_id)
+                self.new_page_id = page_id
+                self._restore(self.journal.state)
+                page_url = _page_url(page_id)
+                self._emit('page_created', url=page_url, resumed=True)
+                print("이전 업로드를 이어서 진행합니다")
+                return page_url
+            print("이어서 올릴 페이지가 없어 새 페이지를 만듭니다")
+            self.journal.reset()
+        return await self._create_page()
+
+    async def duplicate_template_page(self):
+        """새 페이지 생성과 템플릿 읽기를 동시에 진행한 뒤 블록 복사
+
+        저널이 있으면 이전 업로드가 만든 페이지에 이어서 복사하고, 이미 추가된 블록 묶음은
+        다시 보내지 않는다. 그사이 템플릿이 바뀌었으면 반쯤 만든 페이지를 지우고 새로 만든다.
+        """
+        new_page_url, all_blocks = await asyncio.gather(
+            self._resume_page(), self._read_template())
+
+        template_digest = _blocks_digest(all_blocks)
+        if self.journal is not None:
+            if self.journal.state.get('template_digest', template_digest) != template_digest:
+                print("템플릿이 바뀌어 이전 업로드 페이지를 지우고 새로 만듭니다")
+                await self._delete_block(self.new_page_id)
+                self.journal.reset()
+                self.new_page_id = None
+                self._restore({})
+                new_page_url = await self._create_page()
+            self._checkpoint(template_digest=template_digest)
+            if self.journal.state.get('copied'):
+                # 템플릿 복사까지 끝난 업로드: 기록된 테이블 ID로 바로 채우기
+                self._emit('template_copied', blocks=len(all_blocks))
+                return new_page_url
 
-        # 템플릿 페이지 child 블록 가져오기
-        block_list = self.notion.blocks.children.list(self.template_page_id)
+        # 템플릿 테이블에 문서 순서대로 역할 부여
+        template_tables = []
 
-        # 모든 블록을 한 번에 처리하기 위한 리스트
-        all_blocks = []
-        for block in block_list['results']:
-            processed_block = self.process_block(block)
-            if processed_block:
-                all_blocks.append(processed_block)
+        def collect_tables(block):
+            if block['type'] == 'table':
+                template_tables.append(block)
+            for child in _children_of(block):
+                collect_tables(child)
 
-        # 모든 블록을 한 번에 추가 (API 호출 최소화)
+        for block in all_blocks:
+            collect_tables(block)
+        self._table_roles = {id(table): role
+                             for table, role in zip(template_tables, TABLE_ROLES)}
+
+        # 블록 복사 (추가 응답에서 새 테이블 ID를 바로 기록)
+        self.tables = {}
+        self.headers = {}
         if all_blocks:
-            self.notion.blocks.children.append(
-                block_id=self.new_page_id,
-                children=all_blocks
-            )
+            with span('copy_template', 'upload', blocks=len(all_blocks)):
+                await self._append_tree(self.new_page_id, all_blocks)
+        self._checkpoint(copied=True)
+        self._emit('template_copied', blocks=len(all_blocks))
 
-        new_page_url = f"https://notion.so/{self.new_page_id.replace('-', '')}"
         return new_page_url
 
 
+class ExcelToNotionImporter:
+    """AsyncExcelToNotionImporter의 동기 래퍼
+
+    인스턴스마다 이벤트 루프 하나를 두고 그 위에서 비동기 업로더를 실행한다.
+    같은 루프를 계속 쓰므로 HTTP 연결도 호출 간에 재사용된다.
+    """
+
+    def __init__(self, notion_token, parent_page_id, template_page_id, excel_file_path=None, lesson_indices=None,
+                 max_workers=3, use_concurrent=True, progress=None, cancel_event=None, **options):
+        # options는 AsyncExcelToNotionImporter에 그대로 전달 (traversal_concurrency 등)
+        self._loop = asyncio.new_event_loop()
+        self._importer = self._run(self._create(
+            notion_token, parent_page_id, template_page_id, excel_file_path, lesson_indices,
+            max_concurrency=max_workers if use_concurrent else 1,
+            progress=progress, cancel_event=cancel_event, **options))
+
+    @staticmethod
+    async def _create(*args, **kwargs):
+        # 세마포어와 클라이언트가 이 인스턴스의 루프에 묶이도록 루프 안에서 생성
+        return AsyncExcelToNotionImporter(*args, **kwargs)
+
+    def _run(self, coro):
+        return self._loop.run_until_complete(coro)
+
+    def __getattr__(self, name):
+        # excel_data, new_page_id, tables 등은 비동기 업로더의 값을 그대로 노출
+        if name == '_importer':
+            raise AttributeError(name)
+        return getattr(self._importer, name)
+
+    def load_excel_data(self):
+        self._importer.load_excel_data()
+
+    def load_result(self, result):
+        self._importer.load_result(result)
+
+    def duplicate_template_page(self):
+        return self._run(self._importer.duplicate_template_page())
+
+    def update_block(self):
+        self._run(self._importer.update_block())
+
+    def sync_page(self, state):
+        return self._run(self._importer.sync_page(state))
+
+    def close(self):
+        """HTTP 연결과 이벤트 루프 정리"""
+        if not self._loop.is_closed():
+            self._run(self._importer.aclose())
+            self._loop.close()
+
+
+class NotionUploader:
+    """앱이 켜져 있는 동안 유지하는 업로더
+
+    전용 스레드의 이벤트 루프 하나에서 keep-alive HTTP 연결 풀(가능하면 HTTP/2)과
+    요청 스케줄러를 모든 업로드가 함께 쓴다. 업로드마다 TCP/TLS 연결을 새로 맺지 않으며,
+    upload()는 어느 스레드에서 호출해도 된다.
+
+    session_store(notion_session_store.SessionPageStore)를 주면 세션별로 업로드한
+    페이지를 기억해 두고, 같은 세션을 다시 업로드할 때 바뀐 행만 갱신한다.
+    업로드가 중간에 실패했다면 다음 업로드는 그 페이지에 이어서 진행한다.
+    """
+
+    # 연결 풀 설정 (유휴 연결은 keepalive_expiry초 동안 유지)
+    POOL_LIMITS = httpx.Limits(
+        max_connections=20, max_keepalive_connections=10, keepalive_expiry=120)
+
+    # 일괄 업로드에서 동시에 진행할 세션 수 (요청 속도는 공유 스케줄러가 제한)
+    BATCH_SESSIONS = 4
+
+    def __init__(self, notion_token, parent_page_id, template_page_id,
+                 template_cache=None, max_concurrency=10, base_url=None, session_store=None):
+        self.NOTION_TOKEN = notion_token
+        self.base_url = base_url
+        self.parent_page_id = parent_page_id
+        self.template_page_id = template_page_id
+        self.template_cache = template_cache
+        self.session_store = session_store
+        self.max_concurrency = max_concurrency
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="notion-uploader", daemon=True)
+        self._thread.start()
+        self._run(self._open())
+
+    async def _open(self):
+        # 클라이언트와 스케줄러가 업로더 루프에 묶이도록 루프 안에서 생성
+        http2 = importlib.util.find_spec('h2') is not None
+        self._http = httpx.AsyncClient(limits=self.POOL_LIMITS, http2=http2,
+                                       event_hooks={'response': [record_response]})
+        self.notion = AsyncClient(client=self._http,
+                                  **client_options(self.NOTION_TOKEN, self.base_url))
+        self.scheduler = RequestScheduler(
+            min_concurrency=min(2, self.max_concurrency), max_concurrency=self.max_concurrency)
+
+    def _run(self, coro):
+        """업로더 루프에서 코루틴을 실행하고 끝날 때까지 대기"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def warm_up(self):
+        """백그라운드에서 가벼운 요청을 보내 연결을 미리 맺어 둠 (기다리지 않음)"""
+        asyncio.run_coroutine_threadsafe(self._warm_up(), self._loop)
+
+    async def _warm_up(self):
+        try:
+            await self.scheduler.call(lambda: self.notion.users.me())
+        except Exception as e:
+            print(f"Notion 연결 준비 중 오류: {e}")
+
+    def _importer(self, result=None, excel_file_path=None, lesson_indices=None, **options):
+        """공유 클라이언트와 스케줄러를 쓰는 업로더 하나 생성"""
+        return AsyncExcelToNotionImporter(
+            self.NOTION_TOKEN, self.parent_page_id, self.template_page_id,
+            excel_file_path, lesson_indices,
+            template_cache=self.template_cache, scheduler=self.scheduler, notion=self.notion,
+            result=result, **options)
+
+    def upload(self, result=None, excel_file_path=None, lesson_indices=None,
+               progress=None, cancel_event=None, session_date=None, update_existing=True):
+        """템플릿 복제와 테이블 채우기를 실행하고 페이지 URL 반환
+
+        result(TeamResult)를 주면 Excel 파일 없이 바로 업로드한다.
+        페이지 제목은 session_date(datetime.date, 없으면 오늘)이다. 같은 날짜를 전에
+        업로드한 페이지가 남아 있고 update_existing이 참이면 새 페이지를 만들지 않고
+        바뀐 행만 갱신한다. 그 날짜의 업로드가 중간에 실패했었다면
+        update_existing과 관계없이 이어서 진행한다.
+        """
+        session_date = session_date or date.today()
+        importer = self._importer(result, excel_file_path, lesson_indices,
+                                  progress=progress, cancel_event=cancel_event,
+                                  session_date=session_date)
+        return self._run(self._upload(importer, session_date.isoformat(), update_existing))
+
+    def upload_batch(self, sessions, progress=None, cancel_event=None, update_existing=True):
+        """여러 세션 [(날짜, TeamResult), ...]을 한 번에 업로드하고 {날짜: URL 또는 예외} 반환
+
+        세션마다 페이지 생성, 템플릿 복사, 테이블 채우기를 하되 BATCH_SESSIONS개 세션을
+        겹쳐 진행하므로 한 세션이 응답을 기다리는 동안 다른 세션의 요청이 나간다.
+        모든 요청은 같은 스케줄러(속도 제한)를 거치고 템플릿은 한 번만 읽는다.
+        progress(event, info)의 info에는 'session'(날짜)이 들어 있고, 세션이 끝날 때마다
+        session_done 또는 session_failed가 전달된다.
+        """
+        days = [day for day, _ in sessions]
+        if len(set(days)) != len(days):
+            raise ValueError("같은 날짜의 세션이 두 번 들어 있습니다")
+        return self._run(self._upload_batch(sessions, progress, cancel_event, update_existing))
+
+    async def _upload_batch(self, sessions, progress, cancel_event, update_existing):
+        # 템플릿은 처음 필요한 세션이 읽고 나머지 세션은 그 결과를 기다림
+        reader = self._importer(cancel_event=cancel_event)
+        shared = {}
+
+        async def read_template():
+            if 'task' not in shared:
+                shared['task'] = asyncio.ensure_future(reader._read_template())
+            return await asyncio.shield(shared['task'])
+
+        limit = asyncio.Semaphore(self.BATCH_SESSIONS)
+        results = dict.fromkeys(day for day, _ in sessions)  # 입력 순서 유지
+        finished = []
+
+        def emit(event, info):
+            if progress:
+                progress(event, info)
+
+        async def upload_one(day, result):
+            async with limit:
+                importer = self._importer(
+                    result, cancel_event=cancel_event, session_date=day,
+                    template_reader=read_template,
+                    progress=lambda event, info: emit(event, {**info, 'session': day}))
+                try:
+                    with span('upload_session', 'upload', session=day.isoformat()):
+                        page_url = await self._upload(importer, day.isoformat(), update_existing)
+                except UploadCancelled:
+                    raise
+                except Exception as e:
+                    results[day] = e
+                    finished.append(day)
+                    emit('session_failed', {'session': day, 'error': str(e),
+                                            'done': len(finished), 'total': len(sessions)})
+                else:
+                    results[day] = page_url
+                    finished.append(day)
+                    emit('session_done', {'session': day, 'url': page_url,
+                                          'done': len(finished), 'total': len(sessions)})
+
+        await asyncio.gather(*(upload_one(day, result) for day, result in sessions))
+        return results
+
+    def _previous_state(self, session):
+        """같은 부모/템플릿으로 업로드한 세션 페이지 상태 (없으면 None)"""
+        if self.session_store is None or session is None:
+            return None
+        state = self.session_store.load(session)
+        if (state is None or state.get('parent_page_id') != self.parent_page_id
+                or state.get('template_page_id') != self.template_page_id):
+            return None
+        return state
+
+    async def _upload(self, importer, session=None, update_existing=True):
+        state = self._previous_state(session)
+        if state is not None and state.get('complete', True):
+            if update_existing:
+                try:
+                    return await importer.sync_page(state)
+                except SessionPageMissing:
+                    print("이전에 업로드한 페이지가 없어 새 페이지를 만듭니다")
+                finally:
+                    # 일부만 반영되고 실패해도 실제 반영된 행을 기록해 다음 갱신에 사용
+                    if importer.new_page_id is not None:
+                        self._save_state(session, importer)
+            state = None
+
+        if self.session_store is not None and session is not None:
+            # 끝나지 않은 업로드의 기록(state)이 있으면 이어서 진행
+            importer.journal = UploadJournal(self.session_store, session, state)
+        page_url = await importer.duplicate_template_page()
+        await importer.update_block()
+        self._save_state(session, importer)
+        return page_url
+
+    def _save_state(self, session, importer):
+        if self.session_store is not None and session is not None:
+            self.session_store.save(session, {**importer.session_state(), 'complete': True})
+
+    def close(self):
+        """연결 풀과 이벤트 루프 정리 (앱 종료 시 호출)"""
+        if self._loop.is_closed():
+            return
+        self._run(self.notion.aclose())
+        self._run(self._http.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+
 if __name__ == "__main__":
     """ # .env 파일 읽기
+    from dotenv import load_dotenv
     load_dotenv()
     # 스매시 페이지 토큰값
     NOTION_TOKEN = os.getenv("NOTION_TOKEN")
@@ -310,5 +1167,6 @@ if __name__ == "__main__":
     new_page_url = cloner.duplicate_template_page()
     print(f"새 페이지가 생성되었습니다: {new_page_url}")
     cloner.update_block()
+    cloner.close()
     t2 = time.time()
     print(f"notion_api 총 소요 시간: {t2 - t1:.1f}초") """
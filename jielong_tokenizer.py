@@ -0,0 +1,90 @@
+"""接龙/레슨 명단 토크나이저
+
+붙여넣은 텍스트를 앞에서부터 한 줄씩 읽어 번호가 매겨진 줄("12. 홍길동")만 참가자로
+인식한다. 머리말이나 채팅 내용은 번호 줄이 아니므로 무시된다. 채팅 기록 전체처럼 같은
+接龙이 여러 번 붙여넣어진 경우에는 "1." 줄이 나올 때마다 목록을 새로 시작해 마지막 목록을
+사용한다. "코치" 표시가 있는 줄은 is_coach가 참인 Entry가 되며, 거르는 것은 호출하는 쪽
+(team_engine.lesson_names)에서 한다.
+"""
+import re
+from typing import NamedTuple
+
+
+ENTRY_RE = re.compile(r'[ \t]*(\d+)\.[ \t]*(.*)')
+ENTRY_LINE_RE = re.compile(r'^[ \t]*(\d+)\.[ \t]*(.*)$', re.MULTILINE)
+BLOCK_START_RE = re.compile(r'^[ \t]*1\.', re.MULTILINE)
+GUEST_RE = re.compile(r'게스트\s*\(\s*([가-힣]+)\s*\)')
+NAME_RE = re.compile(r'[가-힣]+[A-Z]?')
+COACH_MARK = '코치'
+
+
+class Entry(NamedTuple):
+    position: int   # 接龙 번호
+    name: str       # 그룹 설정과 같은 형식의 이름 (게스트는 "게스트 (이름)")
+    is_guest: bool
+    is_coach: bool  # "코치" 표시가 있는 줄 (이름이 따로 없으면 name은 "김코치"처럼 표시 그대로)
+
+
+def parse_line(line):
+    """한 줄을 Entry로 변환 (번호 줄이 아니거나 이름이 없으면 None)"""
+    match = ENTRY_RE.match(line)
+    if not match:
+        return None
+    return _make_entry(*match.groups())
+
+
+def _make_entry(position, text):
+    guest = GUEST_RE.search(text)
+    if guest:
+        return Entry(int(position), f"게스트 ({guest.group(1)})", True, False)
+
+    tokens = NAME_RE.findall(text)
+    if not tokens:
+        return None
+    names = [token for token in tokens if COACH_MARK not in token]
+    is_coach = len(names) < len(tokens)
+    return Entry(int(position), names[0] if names else tokens[0], False, is_coach)
+
+
+def iter_entries(lines):
+    """줄 단위 입력(파일 객체, 문자열 목록 등)에서 Entry를 순서대로 생성"""
+    for line in lines:
+        entry = parse_line(line)
+        if entry is not None:
+            yield entry
+
+
+def _numbered_lines(text):
+    """번호 줄의 (번호, 내용) 문자열 쌍을 앞에서부터 생성 (Entry는 만들지 않음)
+
+    문자열이면 "1." 줄만 찾는 정규식으로 앞에서부터 훑어 마지막 목록의 시작 위치를
+    정한 뒤 그 뒤의 번호 줄만 읽는다 (줄 목록으로 나누지 않음). 줄 단위 입력은
+    한 줄씩 읽는다.
+    """
+    if isinstance(text, str):
+        start = 0
+        for match in BLOCK_START_RE.finditer(text):
+            start = match.start()
+        for match in ENTRY_LINE_RE.finditer(text, start):
+            yield match.groups()
+        return
+    for line in text:
+        match = ENTRY_RE.match(line)
+        if match:
+            yield match.groups()
+
+
+def tokenize(text):
+    """붙여넣은 텍스트(문자열 또는 줄 단위 입력)에서 마지막 接龙 목록의 Entry 목록 반환
+
+    앞에서부터 한 번만 읽으며 "1." 줄이 나올 때마다 목록을 새로 시작한다. 읽는 동안은
+    번호 줄의 문자열만 모아 두고 마지막 목록만 Entry로 만들므로, 같은 接龙이 여러 번
+    들어 있는 채팅 기록 전체를 붙여넣어도 앞쪽 목록의 이름은 분석하지 않는다.
+    """
+    block = []
+    for position, body in _numbered_lines(text):
+        if int(position) == 1:
+            block = []
+        block.append((position, body))
+    entries = (_make_entry(position, body) for position, body in block)
+    return [entry for entry in entries if entry is not None]
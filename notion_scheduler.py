@@ -0,0 +1,243 @@
+"""Notion API 요청 스케줄러 (속도 제한, 재시도, 적응형 동시 요청 수)"""
+import asyncio
+import random
+import time
+
+import httpx
+from notion_client.errors import APIResponseError, HTTPResponseError, RequestTimeoutError
+
+from tracing import current_request, tracer
+
+
+# Notion 문서 기준 평균 허용 요청 속도 (통합(integration)당 초당 3회)
+NOTION_REQUESTS_PER_SECOND = 3.0
+
+# 재시도할 HTTP 상태 코드 (409는 Notion이 재시도를 권장하는 충돌 오류)
+RETRYABLE_STATUS = {409, 429, 500, 502, 503, 504}
+
+# 쓰기 요청도 다시 보내도 되는 상태 코드 (요청이 반영되지 않았음이 확실한 경우)
+UNAPPLIED_STATUS = {409, 429}
+
+# 취소 여부를 확인하는 간격(초), 재시도 대기 중에도 이 간격으로 확인해 바로 멈춤
+CANCEL_POLL_SECONDS = 0.1
+
+
+async def _sleep(delay, check=None):
+    """delay초 대기, check()가 예외를 발생시키면(취소 등) 대기 중에도 바로 중단"""
+    if check is None:
+        await asyncio.sleep(delay)
+        return
+    deadline = time.monotonic() + delay
+    while True:
+        check()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(remaining, CANCEL_POLL_SECONDS))
+
+
+class TokenBucket:
+    """평균 rate(초당 요청 수)를 지키면서 capacity만큼의 순간 요청은 허용"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def block_until(self, deadline):
+        """Retry-After 등으로 지정된 시각까지 모든 요청을 멈춤"""
+        self._blocked_until = max(self._blocked_until, deadline)
+
+    async def acquire(self, check=None):
+        """토큰 하나를 받을 때까지 대기 (check는 대기 중 취소 확인용, _sleep 참고)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await _sleep(self._blocked_until - now, check)
+                    continue
+                self._tokens = min(self.capacity,
+                                   self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await _sleep((1 - self._tokens) / self.rate, check)
+
+
+class AdaptiveLimit:
+    """동시 요청 수를 floor~ceiling 사이에서 조절 (증가는 천천히, 감소는 빠르게)
+
+    응답 지연이 최근 평균 지연의 latency_tolerance배 안이면 limit번 성공할 때마다
+    1씩 늘리고, 그보다 느리면 1 줄이며, 속도 제한(429)을 받으면 절반으로 줄인다.
+    """
+
+    # 평균 지연(지수 이동 평균)에 새 값을 반영하는 비율
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(self, floor, ceiling, initial=None, latency_tolerance=2.0):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.limit = min(ceiling, max(floor, initial or floor))
+        self.latency_tolerance = latency_tolerance
+        self._in_flight = 0
+        self._successes = 0
+        self._avg_latency = None
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, latency):
+        avg = self._avg_latency
+        if avg is None or latency <= avg * self.latency_tolerance:
+            self._successes += 1
+            if self._successes >= self.limit:
+                self._successes = 0
+                self.limit = min(self.ceiling, self.limit + 1)
+        else:
+            self._successes = 0
+            self.limit = max(self.floor, self.limit - 1)
+        self._avg_latency = latency if avg is None else (
+            avg + self.LATENCY_SMOOTHING * (latency - avg))
+
+    def on_throttle(self):
+        self._successes = 0
+        self.limit = max(self.floor, self.limit // 2)
+
+
+def is_retryable(error, idempotent=True):
+    """다시 보내도 되는 오류인지 여부
+
+    읽기처럼 여러 번 보내도 결과가 같은 요청(idempotent)은 시간 초과, 연결 오류, 5xx도
+    다시 보낸다. 블록 추가나 페이지 생성 같은 쓰기는 서버에 이미 반영되었을 수 있으므로
+    반영되지 않은 것이 확실한 경우(429, 409, 연결 실패)만 바로 다시 보낸다
+    (반영 여부를 모르는 경우는 RequestScheduler.call의 reconcile 참고).
+    """
+    if isinstance(error, (APIResponseError, HTTPResponseError)):
+        return error.status in (RETRYABLE_STATUS if idempotent else UNAPPLIED_STATUS)
+    if isinstance(error, RequestTimeoutError):
+        # notion_client가 httpx 시간 초과를 감싼 오류 (원래 예외는 __context__)
+        cause = error.__context__
+        if idempotent:
+            return True
+        return isinstance(cause, (httpx.ConnectError, httpx.ConnectTimeout))
+    if idempotent:
+        return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
+def retry_after_seconds(error):
+    """응답의 Retry-After 헤더 값(초), 없으면 None"""
+    headers = getattr(error, 'headers', None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestScheduler:
+    """모든 Notion 요청이 거쳐 가는 스케줄러
+
+    토큰 버킷으로 평균 속도를 맞추고, 재시도 가능한 오류는 Retry-After 또는
+    지터를 섞은 지수 백오프 후 다시 보내며, 동시 요청 수는 지연과 429에 따라 조절한다.
+    여러 업로더가 하나의 스케줄러를 공유할 수 있다.
+    """
+
+    def __init__(self, rate=NOTION_REQUESTS_PER_SECOND, burst=None,
+                 min_concurrency=2, max_concurrency=10,
+                 max_retries=5, base_delay=0.5, max_delay=30.0):
+        self.bucket = TokenBucket(rate, burst or max(1, int(rate)))
+        self.concurrency = AdaptiveLimit(min_concurrency, max_concurrency,
+                                         initial=min(max_concurrency, max(min_concurrency, 4)))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff_delay(self, attempt):
+        """attempt번째 재시도 대기 시간 (지수 증가, full jitter)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def call(self, request, on_retry=None, name='request', idempotent=True, check=None,
+                   reconcile=None):
+        """request()가 돌려주는 코루틴을 실행, 재시도 가능한 오류는 다시 시도
+
+        on_retry(attempt, delay, error)는 다시 보내기 전에 호출되며,
+        예외를 발생시키면 재시도를 멈춘다.
+        idempotent가 거짓인 요청(쓰기)은 반영되지 않은 것이 확실한 오류만 바로 다시 보낸다
+        (is_retryable 참고). 시간 초과나 5xx처럼 반영 여부를 모르는 오류는 reconcile이
+        있을 때만 다시 시도하며, 재시도 대기 후 await reconcile()로 먼저 확인한다.
+        reconcile이 None이 아닌 값을 돌려주면 요청이 반영된 것으로 보고 그 값을 결과로
+        반환하고, None이면 반영되지 않은 것이므로 다시 보낸다.
+        check()는 순서를 기다린 뒤, 보내기 직전, 재시도 대기 중에 호출되며
+        예외를 발생시키면(업로드 취소 등) 요청을 보내지 않고 그 예외를 그대로 전달한다.
+        요청 하나(재시도 포함)마다 name으로 span을 기록한다
+        (상태 코드, 바이트 수, 재시도 횟수, 순서를 기다린 시간).
+        """
+        attempt = 0
+        args = {'endpoint': name, 'retries': 0, 'queued': 0.0}
+        token = current_request.set(args)
+        call_started = time.perf_counter()
+        try:
+            while True:
+                unsure = False
+                queued = time.perf_counter()
+                async with self.concurrency:
+                    if check is not None:
+                        check()
+                    await self.bucket.acquire(check)
+                    if check is not None:
+                        check()
+                    started = time.monotonic()
+                    args['queued'] += time.perf_counter() - queued
+                    try:
+                        result = await request()
+                    except Exception as error:
+                        args['status'] = getattr(error, 'status', type(error).__name__)
+                        # 반영 여부를 모르는 쓰기 오류는 reconcile로 확인한 뒤에만 다시 보냄
+                        unsure = (not idempotent and reconcile is not None
+                                  and not is_retryable(error, idempotent)
+                                  and is_retryable(error))
+                        if attempt >= self.max_retries or not (
+                                unsure or is_retryable(error, idempotent)):
+                            raise
+                        last_error = error
+                        delay = retry_after_seconds(error)
+                        if getattr(error, 'status', None) == 429:
+                            self.concurrency.on_throttle()
+                            if delay is not None:
+                                self.bucket.block_until(time.monotonic() + delay)
+                        if delay is None:
+                            delay = self.backoff_delay(attempt)
+                    else:
+                        self.concurrency.on_success(time.monotonic() - started)
+                        args.setdefault('status', 'ok')
+                        return result
+
+                attempt += 1
+                args['retries'] = attempt
+                if on_retry is not None:
+                    on_retry(attempt, delay, last_error)
+                await _sleep(delay, check)
+                if unsure:
+                    applied = await reconcile()
+                    if applied is not None:
+                        args['status'] = 'reconciled'
+                        return applied
+        finally:
+            current_request.reset(token)
+            tracer.record(name, call_started, time.perf_counter() - call_started,
+                          'notion', **args)
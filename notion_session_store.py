@@ -0,0 +1,81 @@
+"""업로드한 세션 페이지의 블록 ID 기록
+
+세션(날짜)마다 마지막으로 업로드한 페이지 ID, 테이블 블록 ID, 행 블록 ID와
+행 내용 요약값을 저장해 두면, 같은 세션을 다시 업로드할 때 새 페이지를 만들지 않고
+바뀐 행만 갱신할 수 있다. 업로드 중에는 같은 파일이 단계별 진행 기록(UploadJournal)으로
+쓰여 실패한 업로드를 이어서 진행할 수 있다.
+"""
+import json
+import os
+import re
+
+
+class SessionPageStore:
+    """세션 키(예: '2025-03-01')별 업로드 상태를 JSON 파일로 저장
+
+    상태 형식:
+        {'page_id': ..., 'page_url': ..., 'parent_page_id': ..., 'template_page_id': ...,
+         'tables': {역할: 테이블 블록 ID}, 'rows': {역할: [[행 블록 ID, 내용 요약값], ...]},
+         'complete': 업로드가 끝났는지 여부}
+
+    업로드 중(complete가 거짓)에는 UploadJournal의 진행 기록도 함께 들어 있다.
+    """
+
+    def __init__(self, state_dir):
+        self.state_dir = state_dir
+
+    def _path(self, session):
+        name = re.sub(r'[^\w.-]', '_', session)
+        return os.path.join(self.state_dir, f"session_{name}.json")
+
+    def load(self, session):
+        """저장된 상태 반환 (없거나 읽을 수 없으면 None)"""
+        try:
+            with open(self._path(session), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, session, state):
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = self._path(session)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'session': session, **state}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"세션 업로드 기록 저장 중 오류: {e}")
+
+    def forget(self, session):
+        try:
+            os.remove(self._path(session))
+        except FileNotFoundError:
+            pass
+
+
+class UploadJournal:
+    """업로드 한 번의 단계별 진행 기록
+
+    페이지 생성, 블록 추가 묶음, 테이블 행 묶음이 끝날 때마다 API가 돌려준 ID를
+    세션 파일에 저장해 둔다. 업로드가 중간에 실패하면 다음 업로드가 이 기록을 읽어
+    끝난 단계는 건너뛰고 처음 끝나지 않은 단계부터 이어서 진행한다.
+    """
+
+    def __init__(self, store, session, state=None):
+        self.store = store
+        self.session = session
+        self.state = dict(state or {})
+        self.state['complete'] = False
+        # 이전 업로드가 만든 페이지를 이어서 채우는 중인지 여부
+        self.resuming = bool(self.state.get('page_id'))
+
+    def update(self, **values):
+        self.state.update(values)
+        self.store.save(self.session, self.state)
+
+    def reset(self):
+        """기록을 지우고 처음부터 다시 시작"""
+        self.state = {'complete': False}
+        self.resuming = False
+        self.store.forget(self.session)
@@ -0,0 +1,59 @@
+"""복사용으로 가공한 Notion 템플릿 블록 트리의 디스크 캐시"""
+import json
+import os
+
+
+class TemplateCache:
+    """템플릿 페이지 ID와 last_edited_time을 키로 가공된 블록 트리를 저장
+
+    템플릿이 바뀌지 않았다면 페이지 메타데이터 조회 한 번으로 블록 트리 전체를
+    다시 읽는 과정을 건너뛸 수 있다.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _path(self, template_page_id):
+        return os.path.join(self.cache_dir, f"template_{template_page_id.replace('-', '')}.json")
+
+    def load(self, template_page_id, last_edited_time):
+        """저장된 블록 트리 반환 (없거나 템플릿이 수정되었으면 None)"""
+        try:
+            with open(self._path(template_page_id), 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get('last_edited_time') != last_edited_time:
+            return None
+        return cached.get('blocks')
+
+    def save(self, template_page_id, last_edited_time, blocks):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(template_page_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'template_page_id': template_page_id,
+                    'last_edited_time': last_edited_time,
+                    'blocks': blocks,
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"템플릿 캐시 저장 중 오류: {e}")
+
+    def invalidate(self, template_page_id=None):
+        """캐시 삭제 (ID를 주지 않으면 모든 템플릿)"""
+        if template_page_id is not None:
+            paths = [self._path(template_page_id)]
+        elif os.path.isdir(self.cache_dir):
+            paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                     if name.startswith('template_') and name.endswith('.json')]
+        else:
+            paths = []
+
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,92 @@
+"""팀 생성 결과를 Excel(xlsx)과 CSV/TSV로 저장하는 내보내기 엔진
+
+결과 모델(team_engine.TeamResult)의 행을 xlsxwriter에 바로 흘려 쓴다.
+constant_memory 모드에서는 행을 순서대로 한 번씩만 쓰고 다 쓴 행은 바로 디스크로
+내보내므로, 결과가 커져도 메모리 사용량이 늘지 않는다. pandas는 사용하지 않는다.
+"""
+import csv
+import os
+
+import xlsxwriter
+
+from team_engine import GROUP_NAMES, ROW_LESSON, ROW_SOLO
+from tracing import span
+
+
+# 시트 이름과 머리글 (excel_to_notion.load_excel_data가 읽는 형식과 동일)
+PAIRING_SHEET = '페어링'
+TEAMS_SHEET = '조편성'
+PAIRING_HEADER = ('t1', 't2')
+TEAMS_HEADER = GROUP_NAMES
+
+# 페어링 행 종류별 배경색 (GUI 태그 색과 동일)
+ROW_COLORS = {
+    ROW_LESSON: '#FFEB9C',  # 노란색 (레슨)
+    ROW_SOLO: '#FFE4E1',    # 빨간색 (단식)
+}
+
+DELIMITERS = {'csv': ',', 'tsv': '\t'}
+
+
+def pairing_table(result):
+    """페어링 시트 행 목록 [(팀1, 팀2, 종류), ...]"""
+    return [(t1, t2, kind) for _, t1, t2, kind in result.pairing_rows()]
+
+
+def teams_table(result):
+    """조편성 시트 행 목록 [(A, B, C), ...]"""
+    return [row[1:] for row in result.group_rows()]
+
+
+def export_xlsx(result, path, delimited=None):
+    """결과를 xlsx로 저장하고 저장한 파일 경로 목록 반환
+
+    delimited에 'csv' 또는 'tsv'를 주면 같은 폴더에 시트별 파일
+    (<이름>_페어링.csv 등)도 함께 저장한다.
+    """
+    if delimited is not None and delimited not in DELIMITERS:
+        raise ValueError(f"지원하지 않는 형식입니다: {delimited}")
+
+    with span('export_xlsx', rows=len(result.pairs)):
+        return _export(result, path, delimited)
+
+
+def _export(result, path, delimited):
+    pairing = pairing_table(result)
+    teams = teams_table(result)
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        formats = {kind: workbook.add_format({'bg_color': color})
+                   for kind, color in ROW_COLORS.items()}
+
+        sheet = workbook.add_worksheet(PAIRING_SHEET)
+        sheet.write_row(0, 0, PAIRING_HEADER)
+        for row_idx, (t1, t2, kind) in enumerate(pairing, start=1):
+            sheet.write_row(row_idx, 0, (t1, t2), formats.get(kind))
+
+        sheet = workbook.add_worksheet(TEAMS_SHEET)
+        sheet.write_row(0, 0, TEAMS_HEADER)
+        for row_idx, row in enumerate(teams, start=1):
+            sheet.write_row(row_idx, 0, row)
+    finally:
+        workbook.close()
+
+    paths = [path]
+    if delimited is not None:
+        stem = os.path.splitext(path)[0]
+        paths.append(write_delimited(
+            f"{stem}_{PAIRING_SHEET}.{delimited}", PAIRING_HEADER,
+            ((t1, t2) for t1, t2, _ in pairing), DELIMITERS[delimited]))
+        paths.append(write_delimited(
+            f"{stem}_{TEAMS_SHEET}.{delimited}", TEAMS_HEADER, teams, DELIMITERS[delimited]))
+    return paths
+
+
+def write_delimited(path, header, rows, delimiter=','):
+    """행을 CSV/TSV로 저장 (Excel에서 한글이 깨지지 않도록 BOM 포함)"""
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return path
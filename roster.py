@@ -0,0 +1,138 @@
+"""그룹 설정(groups.yaml)을 한 번 색인해 두는 로스터 구조"""
+import marshal
+import os
+
+from tracing import span
+
+
+class RosterIndex:
+    """이름 → (조, 순위) 색인과 조별 정렬 명단
+
+    순위는 groups.yaml에 적힌 조 순서, 조 안의 순서를 그대로 이어 붙인 값이다.
+    같은 이름이 여러 번 나오면 처음 위치를 사용한다.
+    """
+
+    def __init__(self, groups_data):
+        self.groups = {}     # 조 이름 → 명단 (튜플, 설정 파일 순서)
+        self.positions = {}  # 이름 → (조 이름, 전체 순위)
+
+        rank = 0
+        for group_name, names in (groups_data.get('groups') or {}).items():
+            names = tuple(names or ())
+            self.groups[group_name] = names
+            for name in names:
+                if name not in self.positions:
+                    self.positions[name] = (group_name, rank)
+                rank += 1
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, name):
+        return name in self.positions
+
+    def group_of(self, name):
+        return self.positions[name][0]
+
+    def rank_of(self, name):
+        return self.positions[name][1]
+
+    def check_known(self, names):
+        """그룹 설정에 없는 이름이 있으면 ValueError"""
+        for name in names:
+            if name not in self.positions:
+                raise ValueError(f"그룹 설정에 없는 이름입니다: {name}")
+
+    def order(self, names):
+        """그룹 설정 순서대로 정렬 (중복 이름은 그대로 유지)"""
+        self.check_known(names)
+        positions = self.positions
+        return sorted(names, key=lambda name: positions[name][1])
+
+    def split_groups(self, names, group_names):
+        """참가자를 조별로 나눔 (조 안에서는 설정 파일 순서, 중복 제거)"""
+        split = {g: [] for g in group_names}
+        positions = self.positions
+        known = [name for name in set(names) if name in positions]
+        for name in sorted(known, key=lambda name: positions[name][1]):
+            group_name = positions[name][0]
+            if group_name in split:
+                split[group_name].append(name)
+        return split
+
+
+class RosterCache:
+    """색인된 로스터를 메모리와 YAML 옆의 바이너리 스냅샷에 보관
+
+    (경로, 크기, 수정 시각)이 그대로이면 YAML을 다시 읽지 않는다.
+    스냅샷은 marshal 형식이라 순수 데이터만 담기며 불러올 때 코드가 실행되지 않는다.
+    """
+
+    SNAPSHOT_SUFFIX = '.cache'
+    SNAPSHOT_VERSION = 1
+
+    def __init__(self):
+        self._entries = {}  # 절대 경로 → (키, RosterIndex)
+
+    @staticmethod
+    def _file_key(path):
+        st = os.stat(path)
+        return (path, st.st_size, st.st_mtime_ns)
+
+    def get(self, yaml_path):
+        """파일이 바뀐 경우에만 다시 로드한 RosterIndex 반환 (없으면 FileNotFoundError)"""
+        path = os.path.abspath(yaml_path)
+        key = self._file_key(path)
+
+        entry = self._entries.get(path)
+        if entry and entry[0] == key:
+            return entry[1]
+
+        with span('roster_load') as info:
+            groups = self._load_snapshot(path, key)
+            info['source'] = 'snapshot'
+            if groups is None:
+                import yaml  # 스냅샷이 없을 때만 필요 (시작 시 불러오지 않음)
+
+                info['source'] = 'yaml'
+                with open(path, 'r', encoding='utf-8') as f:
+                    groups = self._plain_groups(yaml.safe_load(f) or {})
+                self._save_snapshot(path, key, groups)
+
+            roster = RosterIndex({'groups': groups})
+        self._entries[path] = (key, roster)
+        return roster
+
+    def invalidate(self, yaml_path=None):
+        """메모리 캐시 비우기 (경로를 주면 해당 파일만)"""
+        if yaml_path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(os.path.abspath(yaml_path), None)
+
+    def _load_snapshot(self, path, key):
+        try:
+            with open(path + self.SNAPSHOT_SUFFIX, 'rb') as f:
+                version, snapshot_key, groups = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != self.SNAPSHOT_VERSION or tuple(snapshot_key) != key:
+            return None
+        return groups
+
+    @staticmethod
+    def _plain_groups(groups_data):
+        """YAML 데이터를 {조 이름: (이름, ...)} 형태의 순수 데이터로 변환"""
+        return {
+            str(group_name): tuple(str(name) for name in names or ())
+            for group_name, names in (groups_data.get('groups') or {}).items()
+        }
+
+    def _save_snapshot(self, path, key, groups):
+        tmp_path = f"{path}{self.SNAPSHOT_SUFFIX}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                marshal.dump((self.SNAPSHOT_VERSION, key, groups), f)
+            os.replace(tmp_path, path + self.SNAPSHOT_SUFFIX)
+        except OSError as e:
+            print(f"로스터 스냅샷 저장 중 오류: {e}")
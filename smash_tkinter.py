@@ -1,16 +1,34 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import os
 import webbrowser  # 웹브라우저 열기 위한 모듈 추가
-import re
-from dotenv import load_dotenv
-import pandas as pd
-import yaml
-from excel_to_notion import ExcelToNotionImporter
+from datetime import date
+# pandas/notion_client/xlsxwriter를 불러오는 모듈(excel_to_notion, result_export)은
+# 시작 속도를 위해 처음 사용할 때 불러온다
+import team_engine
+from roster import RosterCache
+from jielong_tokenizer import tokenize
+from tree_render import TreeTable
+from notion_template_cache import TemplateCache
+from notion_session_store import SessionPageStore
+from tracing import span, tracer
+from stall_watchdog import StallWatchdog, STALL_THRESHOLD_MS
 import time
 import sys
 import subprocess
+import shutil
 import configparser
+import queue
+import threading
+
+# 실시간 미리보기: 마지막 입력 후 이 시간(ms)이 지나면 갱신
+LIVE_PREVIEW_DELAY_MS = 300
+# Notion 업로드 진행 상황 확인 주기(ms)
+UPLOAD_POLL_MS = 100
+# 일괄 업로드 중 UI로 전달할 진행 이벤트 (세션 안의 단계별 이벤트는 전달하지 않음)
+BATCH_EVENTS = ('retry', 'session_done', 'session_failed')
+# 첫 화면이 뜬 뒤 Notion 모듈을 불러오고 연결을 준비하기까지의 대기 시간(ms)
+NOTION_WARM_UP_DELAY_MS = 1000
 
 
 def resource_path(relative_path):
@@ -40,29 +58,61 @@ class SmashTeamGenerator(tk.Tk):
         # 설정 파일 경로
         self.config_file_path = os.path.join(self.config_dir, "config.ini")
 
-        # Notion 토큰 초기화
-        self.NOTION_TOKEN = self.load_notion_token()
+        # Notion 토큰 (첫 업로드 때 설정 파일에서 읽거나 사용자에게 요청)
+        self.NOTION_TOKEN = None
 
-        # Notion 관련 정보 설정
+        # Notion 관련 정보 설정 (config.ini [Notion]에 값이 있으면 업로드 시 그 값을 사용)
         self.parent_page_id = "1a39f0ea074e80e085a5dbe8bfa5404f"
         self.template_page_id = "1a79f0ea074e807b9b18c586b0890893"
+        self.notion_base_url = None  # None이면 실제 Notion API
 
         # YAML 파일 경로 설정
         self.yaml_file_path = os.path.join(self.config_dir, "groups.yaml")
+        self.roster_cache = RosterCache()
 
-        # 기본 YAML 파일이 없으면 기본 파일 복사
-        self.ensure_yaml_file_exists()
+        # 복사용 Notion 템플릿 블록 캐시
+        self.template_cache = TemplateCache(
+            os.path.join(self.config_dir, "template_cache"))
+        # 세션(날짜)별로 업로드한 Notion 페이지 기록 (다시 업로드하면 바뀐 행만 갱신)
+        self.session_pages = SessionPageStore(
+            os.path.join(self.config_dir, "notion_sessions"))
 
         # 엑셀 파일 저장 경로 설정
         self.excel_file_path = os.path.join(
             self.config_dir, "team_composition_result.xlsx")
         self.notion_page_url = None  # 생성된 Notion 페이지 URL 저장
+        self.current_result = None  # 화면에 표시 중인 팀 생성 결과 (업로드에 그대로 사용)
+
+        # 앱이 켜져 있는 동안 연결을 재사용하는 Notion 업로더 (처음 필요할 때 생성)
+        self.notion_uploader = None
+        self.notion_uploader_lock = threading.Lock()
+
+        # UI 멈춤 감지기 (config.ini [Watchdog]으로 끄거나 기준 시간 변경, 기록은 stall.log)
+        self.stall_log_path = os.path.join(self.config_dir, "stall.log")
+        self.stall_watchdog = None
 
         # GUI 스타일 초기화
         self.init_style()
         # 메인 위젯 생성
         self.create_widgets()
 
+        # 파일 읽기와 Notion 준비는 첫 화면이 그려진 뒤에 실행
+        self.after_idle(self.load_initial_data)
+        self.after(NOTION_WARM_UP_DELAY_MS, self.warm_up_notion)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def load_initial_data(self):
+        """UI 멈춤 감지 시작, 그룹 설정 준비, 예시 입력 채우기, 로스터 미리 색인"""
+        self.start_stall_watchdog()
+
+        # 기본 YAML 파일이 없으면 기본 파일 복사
+        self.ensure_yaml_file_exists()
+        self.load_examples()
+        try:
+            self.roster_cache.get(self.yaml_file_path)
+        except Exception as e:
+            print(f"그룹 설정 로드 중 오류: {e}")
+
     def init_style(self):
         """스타일 설정"""
         self.style = ttk.Style()
@@ -98,6 +148,12 @@ class SmashTeamGenerator(tk.Tk):
         self.lesson_text = self.create_text_area(
             input_frame, "제외 명단 (코치/레슨생):", 1, "lesson")
 
+        # 실시간 미리보기: 입력이 바뀌면 잠시 후 달라진 인원만 반영
+        self.live_session = None
+        self.live_after_id = None
+        for text_widget in (self.jielong_text, self.lesson_text):
+            text_widget.bind("<<Modified>>", self.on_input_modified)
+
         input_frame.grid_columnconfigure(0, weight=1)  # 접룡 영역 가중치 1
         input_frame.grid_columnconfigure(1, weight=1)  # 제외명단 영역 가중치 1
         input_frame.grid_rowconfigure(0, weight=1)
@@ -112,23 +168,8 @@ class SmashTeamGenerator(tk.Tk):
 
         text_widget = tk.Text(frame, wrap=tk.WORD, height=10,
                               font=('맑은 고딕', 10))
-        # tmp 예시추가
-        if example == "jielong":
-            try:
-                file_path = resource_path('examples/jielong.txt')
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    example_text = f.read()
-                    text_widget.insert(tk.END, example_text)
-            except FileNotFoundError:
-                print("jielong 예시 파일이 존재하지 않습니다")
-        elif example == "lesson":
-            try:
-                file_path = resource_path('examples/lesson.txt')
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    example_text = f.read()
-                    text_widget.insert(tk.END, example_text)
-            except FileNotFoundError:
-                print("lesson 예시 파일이 존재하지 않습니다")
+        # 예시 파일 이름 (내용은 화면이 뜬 뒤 load_examples에서 채움)
+        text_widget.example = example
 
         scroll = ttk.Scrollbar(frame, command=text_widget.yview)
         text_widget.configure(yscrollcommand=scroll.set)
@@ -138,6 +179,19 @@ class SmashTeamGenerator(tk.Tk):
 
         return text_widget
 
+    def load_examples(self):
+        """입력란이 비어 있으면 examples 폴더의 예시 내용으로 채움"""
+        for text_widget in (self.jielong_text, self.lesson_text):
+            if text_widget.get("1.0", "end-1c"):
+                continue
+            example = text_widget.example
+            try:
+                file_path = resource_path(f'examples/{example}.txt')
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    text_widget.insert(tk.END, f.read())
+            except FileNotFoundError:
+                print(f"{example} 예시 파일이 존재하지 않습니다")
+
     def create_result_section(self, parent):
         """결과 표시 영역"""
         result_frame = ttk.LabelFrame(parent, text="■ 팀 구성 결과")
@@ -164,6 +218,11 @@ class SmashTeamGenerator(tk.Tk):
         self.pairing_tree.column('t1', width=120, anchor='center')
         self.pairing_tree.heading('t2', text='팀 2', anchor='center')
         self.pairing_tree.column('t2', width=120, anchor='center')
+        # 单打 인원은 빨간색, 레슨 인원은 노란색
+        self.pairing_table = TreeTable(self.pairing_tree, tag_styles={
+            'solo': {'background': '#FFE4E1'},
+            'lesson': {'background': '#FFEB9C'},
+        })
 
         # 스크롤바 추가
         scrollbar = ttk.Scrollbar(pairing_frame, orient=tk.VERTICAL,
@@ -191,6 +250,7 @@ class SmashTeamGenerator(tk.Tk):
         self.group_tree.column('B', width=100, anchor='center')
         self.group_tree.heading('C', text='C조', anchor='center')
         self.group_tree.column('C', width=100, anchor='center')
+        self.group_table = TreeTable(self.group_tree)
 
         # 스크롤바 추가
         scrollbar = ttk.Scrollbar(group_frame, orient=tk.VERTICAL,
@@ -208,19 +268,43 @@ class SmashTeamGenerator(tk.Tk):
         ttk.Button(btn_frame, text="추출하기",
                    command=self.export_to_excel).pack(side=tk.LEFT, padx=5)
 
-        # Notion 업로드 버튼 추가
-        ttk.Button(btn_frame, text="Notion 업로드",
-                   command=self.upload_to_notion).pack(side=tk.LEFT, padx=5)
+        # Notion 업로드 버튼 추가 (업로드 중에는 취소 버튼 활성화)
+        self.upload_button = ttk.Button(btn_frame, text="Notion 업로드",
+                                        command=self.upload_to_notion)
+        self.upload_button.pack(side=tk.LEFT, padx=5)
+        self.batch_upload_button = ttk.Button(btn_frame, text="일괄 업로드",
+                                              command=self.batch_upload_to_notion)
+        self.batch_upload_button.pack(side=tk.LEFT, padx=5)
+        self.cancel_upload_button = ttk.Button(btn_frame, text="업로드 취소",
+                                               command=self.cancel_upload,
+                                               state=tk.DISABLED)
+        self.cancel_upload_button.pack(side=tk.LEFT, padx=5)
+        # 체크하면 오늘 이미 업로드한 페이지가 있을 때 새로 만들지 않고 바뀐 행만 갱신
+        self.update_existing_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(btn_frame, text="기존 페이지 갱신",
+                        variable=self.update_existing_var).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="템플릿 새로고침",
+                   command=self.refresh_template_cache).pack(side=tk.LEFT, padx=5)
 
         ttk.Button(btn_frame, text="초기화",
                    command=self.clear_inputs).pack(side=tk.LEFT, padx=5)
 
+        self.live_preview_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frame, text="실시간 미리보기",
+                        variable=self.live_preview_var,
+                        command=self.toggle_live_preview).pack(side=tk.LEFT, padx=5)
+
         # 새 버튼 추가: 그룹 설정 편집과 결과 폴더 열기
         ttk.Button(btn_frame, text="그룹 설정 편집",
                    command=self.open_yaml_editor).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="결과 폴더 열기",
                    command=self.open_result_folder).pack(side=tk.LEFT, padx=5)
 
+        self.perf_panel_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frame, text="성능",
+                        variable=self.perf_panel_var,
+                        command=self.toggle_perf_panel).pack(side=tk.LEFT, padx=5)
+
         # Notion 링크 표시 레이블 추가
         self.notion_link_frame = ttk.Frame(result_frame)
         self.notion_link_frame.pack(pady=5)
@@ -237,211 +321,139 @@ class SmashTeamGenerator(tk.Tk):
         self.notion_status_label = ttk.Label(self.notion_link_frame, text="")
         self.notion_status_label.pack(side=tk.LEFT, padx=10)
 
+        # 단계별 소요 시간 패널 ('성능'을 체크하면 표시)
+        self.create_perf_panel(result_frame)
+
+    def create_perf_panel(self, parent):
+        """단계별 소요 시간 요약 패널 (처음에는 숨김)"""
+        self.perf_frame = ttk.LabelFrame(parent, text=" 단계별 소요 시간")
+
+        columns = ('name', 'count', 'total', 'max', 'bytes', 'retries')
+        self.perf_tree = ttk.Treeview(self.perf_frame, columns=columns,
+                                      show='headings', height=8)
+        for column, text, width in (('name', '이름', 200), ('count', '횟수', 60),
+                                    ('total', '합계(ms)', 90), ('max', '최대(ms)', 90),
+                                    ('bytes', '바이트', 90), ('retries', '재시도', 60)):
+            self.perf_tree.heading(column, text=text, anchor='center')
+            self.perf_tree.column(column, width=width,
+                                  anchor=tk.W if column == 'name' else tk.E)
+        # Notion 요청은 회색 글씨로 구분
+        self.perf_table = TreeTable(self.perf_tree, tag_styles={
+            'notion': {'foreground': '#555555'},
+        })
+
+        scrollbar = ttk.Scrollbar(self.perf_frame, orient=tk.VERTICAL,
+                                  command=self.perf_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.perf_tree.configure(yscroll=scrollbar.set)
+        self.perf_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        perf_btn_frame = ttk.Frame(self.perf_frame)
+        perf_btn_frame.pack(side=tk.LEFT, fill=tk.Y, padx=5)
+        ttk.Button(perf_btn_frame, text="새로고침",
+                   command=self.refresh_perf_panel).pack(fill=tk.X, pady=2)
+        ttk.Button(perf_btn_frame, text="초기화",
+                   command=self.clear_perf_records).pack(fill=tk.X, pady=2)
+        ttk.Button(perf_btn_frame, text="JSON 내보내기",
+                   command=self.export_trace).pack(fill=tk.X, pady=2)
+
     def generate_teams(self):
         """팀 생성 핵심 로직"""
         try:
-            # 1. 입력 데이터 처리
-            # 1.1 입력 데이터 가져오기
-            jielong_content = self.jielong_text.get("1.0", tk.END).strip()
-            lesson_content = self.lesson_text.get("1.0", tk.END).strip()
-
-            # 接龙 입력값 검증
-            if not jielong_content:
-                raise ValueError("接龙 내용을 입력해주세요")
-
-            # 1.2 接龙 내용 추출
-            jielong_start = jielong_content.find('1.')
-            if jielong_start == -1:
-                raise ValueError("접룡 내용에 '1.' 표시가 없습니다")
-
-            # 接龙 명단 추출
-            jielong_names_list = re.findall(
-                r'(?:게스트\s\([가-힣]+\)|[가-힣]+[A-Z]?)', jielong_content[jielong_start:])
-            print(f"접룡 인원: {len(jielong_names_list)} 명")
-            # print(jielong_names_list)
-
-            # 1.3 레슨 내용 추출
-            lesson_names_list = []
-            if lesson_content:
-                lesson_start = lesson_content.find('1.')
-                if lesson_start == -1:
-                    raise ValueError("레슨 인원에 '1.' 표시가 없습니다")
-            # 레슨 명단 추출
-                lesson_names_list = re.findall(
-                    r'[가-힣]+[A-Z]?', lesson_content[lesson_start:])
-                lesson_names_list = [
-                    name for name in lesson_names_list if "코치" not in name]
-                print(f"레슨 인원: {len(lesson_names_list)} 명")
-                # print(lesson_names_list)
-
-            # 2. 그룹 데이터 로드 (사용자 문서 폴더에서)
+            # 1. 입력 데이터 가져오기
+            jielong_content = self.jielong_text.get("1.0", tk.END)
+            lesson_content = self.lesson_text.get("1.0", tk.END)
+
+            # 2. 그룹 데이터 로드 (사용자 문서 폴더, 파일이 바뀐 경우에만 다시 읽음)
             try:
-                with open(self.yaml_file_path, 'r', encoding='utf-8') as f:
-                    groups_data = yaml.safe_load(f)
+                roster = self.roster_cache.get(self.yaml_file_path)
             except FileNotFoundError:
                 # 파일이 없는 경우 기본 파일에서 로드
-                yaml_path = resource_path('groups.yaml')
-                with open(yaml_path, 'r', encoding='utf-8') as f:
-                    groups_data = yaml.safe_load(f)
+                roster = self.roster_cache.get(resource_path('groups.yaml'))
                 # 파일이 사라진 경우 다시 생성
                 self.ensure_yaml_file_exists()
 
-            # 3. 1st 페어링 편성
-            # 3.1 접룡 인원 정렬
-            ordered_list = []
-            for group in groups_data['groups'].values():
-                ordered_list.extend(group)
-            jielong_ordered_list = sorted(
-                jielong_names_list, key=lambda x: ordered_list.index(x))
-
-            # 3.2 접룡 인원에서 레슨 인원 제외
-            pairing_list = [
-                name for name in jielong_ordered_list if name not in lesson_names_list]
-
-            # 홀수 짝수 확인, 홀수면 单打 인원 선택/입력 창 호출
-            solo_player = None
-            if len(pairing_list) % 2 != 0:
-                # 单打 인원 선택/입력 창
-                selected_player = self.show_solo_selection_dialog(pairing_list)
-                if not selected_player:
-                    raise ValueError("팀 생성에 필요한 单打 인원을 선택해야 합니다")
-
-                solo_player = selected_player
-                pairing_list.remove(solo_player)  # 单打 인원 제외
-
-            # 3.3 정렬된 인원 페어링 편성
-            half = len(pairing_list) // 2
-            first_column = pairing_list[:half]
-            second_column = pairing_list[half:][::-1]
-
-            # 3.4 트리뷰 초기화 및 데이터 삽입
-            self.pairing_tree.delete(*self.pairing_tree.get_children())
-
-            # 페어링 인원 추가
-            for i, (t1, t2) in enumerate(zip(first_column, second_column), start=1):
-                self.pairing_tree.insert('', tk.END, values=(i, t1, t2))
-
-            # 单打 인원 추가 (빨간색)
-            if solo_player:
-                last_index = len(self.pairing_tree.get_children()) + 1
-                self.pairing_tree.insert(
-                    '', tk.END,
-                    values=(last_index, solo_player, ""),
-                    tags=('solo',)
-                )
-                self.pairing_tree.tag_configure('solo', background='#FFE4E1')
-
-            # 레슨 인원 추가 (노란색으로 변경)
-            if lesson_names_list:
-                lesson_pairs = []
-                for i in range(0, len(lesson_names_list), 2):
-                    pair = (
-                        lesson_names_list[i],
-                        lesson_names_list[i+1] if i+1 < len(lesson_names_list) else '')
-                    lesson_pairs.append(pair)
-                last_index = len(self.pairing_tree.get_children())
-                for i, (t1, t2) in enumerate(lesson_pairs, start=1):
-                    self.pairing_tree.insert(
-                        '', tk.END,
-                        values=(i+last_index, t1, t2),
-                        tags=('lesson',)
-                    )
-                self.pairing_tree.tag_configure(
-                    'lesson', background='#FFEB9C')
-
-            # 4. 2nd 조 편성
-            # 4.1 접룡 인원 그룹별로 분리
-            filtered_groups = {
-                'A': [name for name in groups_data['groups']['A'] if name in jielong_names_list],
-                'B': [name for name in groups_data['groups']['B'] if name in jielong_names_list],
-                'C': [name for name in groups_data['groups']['C'] if name in jielong_names_list]
-            }
-
-            # 4.2 트리뷰에 표시
-            self.group_tree.delete(*self.group_tree.get_children())
-
-            max_length = max(len(filtered_groups['A']),
-                             len(filtered_groups['B']),
-                             len(filtered_groups['C']))
-
-            for i in range(max_length):
-                #fmt: off
-                a = filtered_groups['A'][i] if i < len(filtered_groups['A']) else ''
-                b = filtered_groups['B'][i] if i < len(filtered_groups['B']) else ''
-                c = filtered_groups['C'][i] if i < len(filtered_groups['C']) else ''
-                #fmt: on
-                self.group_tree.insert('', tk.END, values=(i+1, a, b, c))
+            # 3. 페어링 및 조 편성 (홀수면 单打 인원 선택/입력 창 호출)
+            result = team_engine.generate_teams(
+                jielong_content, lesson_content, roster,
+                choose_solo=self.show_solo_selection_dialog)
+            print(f"접룡 인원: {result.attendees} 명")
+
+            # 4. 트리뷰에 표시 (이전 결과와 달라진 행만 반영)
+            self.show_result(result)
 
             self.status_bar.config(text="팀 생성 완료")
 
         except Exception as e:
             messagebox.showerror("오류", str(e))
 
+    def on_input_modified(self, event):
+        """입력 변경 시 실시간 미리보기 예약 (연속 입력은 한 번으로 묶음)"""
+        if not event.widget.edit_modified():
+            return
+        event.widget.edit_modified(False)
+        if not self.live_preview_var.get():
+            return
+        if self.live_after_id is not None:
+            self.after_cancel(self.live_after_id)
+        self.live_after_id = self.after(LIVE_PREVIEW_DELAY_MS, self.update_live_preview)
+
+    def toggle_live_preview(self):
+        """실시간 미리보기 켜기/끄기"""
+        self.live_session = None
+        if self.live_preview_var.get():
+            self.update_live_preview()
+
+    def update_live_preview(self):
+        """달라진 인원만 반영해 결과 갱신 (单打 선택 창 없이 자동 선택)"""
+        self.live_after_id = None
+        try:
+            try:
+                roster = self.roster_cache.get(self.yaml_file_path)
+            except FileNotFoundError:
+                roster = self.roster_cache.get(resource_path('groups.yaml'))
+
+            # 그룹 설정이 바뀌면 처음부터 다시 계산
+            if self.live_session is None or self.live_session.roster is not roster:
+                self.live_session = team_engine.LiveSession(roster)
+
+            jielong_content = self.jielong_text.get("1.0", tk.END)
+            lesson_content = self.lesson_text.get("1.0", tk.END)
+            jielong_names = [entry.name for entry in tokenize(jielong_content)]
+            lesson_names = team_engine.lesson_names(tokenize(lesson_content))
+
+            result, added, removed = self.live_session.update(
+                jielong_names, lesson_names)
+        except Exception as e:
+            self.status_bar.config(text=f"미리보기 오류: {e}")
+            return
+
+        self.show_result(result)
+        self.status_bar.config(
+            text=f"미리보기: {result.attendees}명 "
+                 f"(+{sum(added.values())} / -{sum(removed.values())})")
+
+    def show_result(self, result):
+        """팀 생성 결과를 페어링/조 편성 테이블에 표시"""
+        self.current_result = result
+        with span('render', rows=len(result.pairs)):
+            self.pairing_table.render(
+                ((i, t1, t2), (kind,) if kind != team_engine.ROW_PAIR else ())
+                for i, t1, t2, kind in result.pairing_rows()
+            )
+            self.group_table.render((row, ()) for row in result.group_rows())
+        self.refresh_perf_panel()
+
     def export_to_excel(self):
-        """Excel 추출 기능 (시트 분리)"""
+        """Excel 추출 기능 (시트 분리, 표시 중인 결과를 한 번에 기록)"""
         try:
-            group_data = [
-                self.group_tree.item(item)['values'][1:]  # 인덱스 제거
-                for item in self.group_tree.get_children()
-            ]
-            # 결과 데이터 추출
-            pair_data = []
-            self.lesson_indices = []  # 레슨 행 인덱스
-            self.solo_indices = []    # 단식 행 인덱스
-
-            for i, item in enumerate(self.pairing_tree.get_children()):
-                values = self.pairing_tree.item(item)['values'][1:]  # 인덱스 제거
-                pair_data.append(values)
-
-                # 태그 확인하여 인덱스 저장
-                tags = self.pairing_tree.item(item, 'tags')
-                if 'lesson' in tags:
-                    self.lesson_indices.append(i)
-                if 'solo' in tags:
-                    self.solo_indices.append(i)
-
-            # Excel 파일 생성
-            with pd.ExcelWriter(self.excel_file_path, engine='xlsxwriter') as writer:
-                # 페어링 데이터프레임 생성
-                pairing_df = pd.DataFrame(pair_data, columns=['t1', 't2'])
-
-                # 페어링 시트에 데이터 쓰기
-                pairing_df.to_excel(
-                    writer,
-                    sheet_name='페어링',
-                    index=False,
-                )
+            if self.current_result is None:
+                messagebox.showerror("오류", "추출할 결과가 없습니다. 먼저 '팀 생성'을 실행해주세요.")
+                return
 
-                # 워크북과 워크시트 객체 가져오기
-                workbook = writer.book
-                pairing_sheet = writer.sheets['페어링']
-
-                # 포맷 생성
-                yellow_format = workbook.add_format(
-                    {'bg_color': '#FFEB9C'})  # 노란색 (레슨)
-                red_format = workbook.add_format(
-                    {'bg_color': '#FFE4E1'})     # 빨간색 (단식)
-
-                # 레슨 행에 노란색 배경 적용
-                for row_idx in self.lesson_indices:
-                    pairing_sheet.write(
-                        row_idx + 1, 0, pairing_df.iloc[row_idx, 0], yellow_format)
-                    pairing_sheet.write(
-                        row_idx + 1, 1, pairing_df.iloc[row_idx, 1], yellow_format)
-
-                # 단식 행에 빨간색 배경 적용
-                for row_idx in self.solo_indices:
-                    pairing_sheet.write(
-                        row_idx + 1, 0, pairing_df.iloc[row_idx, 0], red_format)
-                    pairing_sheet.write(
-                        row_idx + 1, 1, pairing_df.iloc[row_idx, 1], red_format)
-
-                group_df = pd.DataFrame(group_data, columns=['A', 'B', 'C'])
-                group_df.to_excel(
-                    writer,
-                    sheet_name='조편성',
-                    index=False,
-                )
+            from result_export import export_xlsx
+
+            export_xlsx(self.current_result, self.excel_file_path)
 
             self.status_bar.config(text=f"엑셀 추출 완료: {self.excel_file_path}")
             messagebox.showinfo("성공",
@@ -456,8 +468,10 @@ class SmashTeamGenerator(tk.Tk):
         """입력 초기화"""
         self.jielong_text.delete("1.0", tk.END)
         self.lesson_text.delete("1.0", tk.END)
-        self.pairing_tree.delete(*self.pairing_tree.get_children())
-        self.group_tree.delete(*self.group_tree.get_children())
+        self.pairing_table.clear()
+        self.group_table.clear()
+        self.live_session = None
+        self.current_result = None
         self.notion_link_label.config(text="")
         self.notion_status_label.config(text="")
         self.notion_link_label.unbind("<Button-1>")
@@ -501,46 +515,262 @@ class SmashTeamGenerator(tk.Tk):
         return getattr(dialog, 'selected_player', None)
 
     def upload_to_notion(self):
-        """Notion에 업로드하는 기능"""
-        # 엑셀 파일이 존재하는지 확인
-        if not os.path.exists(self.excel_file_path):
-            messagebox.showerror("오류", "엑셀 파일이 존재하지 않습니다. 먼저 '추출하기'를 실행해주세요.")
+        """Notion에 업로드하는 기능 (작업 스레드에서 실행, UI는 큐로 진행 상황 반영)
+
+        화면에 표시 중인 팀 생성 결과를 그대로 넘기므로 엑셀 추출은 필요 없다.
+        """
+        result = self.current_result
+        if result is None:
+            messagebox.showerror("오류", "업로드할 결과가 없습니다. 먼저 '팀 생성'을 실행해주세요.")
+            return
+
+        if not self.ensure_notion_token():
+            return
+
+        self.start_upload(self.run_upload, result, date.today(), self.update_existing_var.get())
+
+    def batch_upload_to_notion(self):
+        """세션 폴더들을 골라 날짜별 Notion 페이지로 한 번에 업로드
+
+        고른 폴더의 하위 폴더 하나가 세션 하나이며(team_batch와 같은 jielong.txt/lesson.txt),
+        폴더 이름의 날짜(예: 2025-03-01)가 페이지 제목이 된다.
+        """
+        from team_batch import find_sessions, load_session, session_date
+
+        sessions_dir = filedialog.askdirectory(
+            parent=self, title="세션 폴더들이 들어 있는 폴더 선택", initialdir=self.config_dir)
+        if not sessions_dir:
+            return
+
+        dated, skipped = {}, []
+        for session_dir in find_sessions(sessions_dir):
+            day = session_date(session_dir)
+            if day is None:
+                skipped.append(os.path.basename(session_dir))
+            elif day in dated:
+                messagebox.showerror("오류", f"같은 날짜({day})의 세션 폴더가 둘 이상 있습니다:\n"
+                                           f"{os.path.basename(dated[day])}, {os.path.basename(session_dir)}")
+                return
+            else:
+                dated[day] = session_dir
+        if not dated:
+            messagebox.showerror("오류", "폴더 이름에 날짜가 있는 세션 폴더(jielong.txt 포함)를 찾지 못했습니다.")
             return
 
         try:
-            # 기존 바인딩 제거 및 레이블 초기화
-            self.notion_link_label.config(text="")
-            self.notion_link_label.unbind("<Button-1>")
+            roster = self.roster_cache.get(self.yaml_file_path)
+            sessions = [(day, load_session(dated[day], roster)) for day in sorted(dated)]
+        except Exception as e:
+            messagebox.showerror("오류", f"세션 팀 생성 중 오류: {e}")
+            return
 
-            # 업로드 시작 표시
-            self.notion_status_label.config(
-                text="Notion 업로드 중...", foreground="orange")
-            self.update_idletasks()  # UI 업데이트
+        message = f"{len(sessions)}개 세션({sessions[0][0]} ~ {sessions[-1][0]})을 업로드합니다."
+        if skipped:
+            message += f"\n\n날짜가 없어 제외한 폴더: {', '.join(skipped)}"
+        if not messagebox.askyesno("일괄 업로드", message):
+            return
+        if not self.ensure_notion_token():
+            return
 
-            # 실행 시간 측정 시작
-            t1 = time.time()
+        self.start_upload(self.run_batch_upload, sessions, self.update_existing_var.get())
 
-            # lesson_indices 확인 - 없으면 빈 리스트로 초기화
-            lesson_indices = getattr(self, 'lesson_indices', [])
+    def ensure_notion_token(self):
+        """처음 업로드할 때 토큰 확인 (설정 파일에 없으면 입력 요청), 토큰이 있으면 True"""
+        if not self.NOTION_TOKEN:
+            self.NOTION_TOKEN = self.load_notion_token()
+            if not self.NOTION_TOKEN:
+                messagebox.showerror("오류", "Notion 토큰이 설정되지 않았습니다.")
+                return False
+        return True
 
-            # ExcelToNotionImporter 인스턴스 생성 및 실행
-            cloner = ExcelToNotionImporter(
-                self.NOTION_TOKEN,
-                self.parent_page_id,
-                self.template_page_id,
-                self.excel_file_path,
-                lesson_indices,
-            )
+    def start_upload(self, target, *args):
+        """업로드 작업 스레드 시작 target(uploader, *args, events, cancel_event)"""
+        # 기존 바인딩 제거 및 레이블 초기화
+        self.notion_link_label.config(text="")
+        self.notion_link_label.unbind("<Button-1>")
 
-            # 템플릿 페이지 복제
-            self.notion_page_url = cloner.duplicate_template_page()
+        # 업로드 시작 표시
+        self.notion_status_label.config(
+            text="Notion 업로드 중...", foreground="orange")
+        self.upload_button.config(state=tk.DISABLED)
+        self.batch_upload_button.config(state=tk.DISABLED)
+        self.cancel_upload_button.config(state=tk.NORMAL)
+
+        self.upload_queue = queue.Queue()
+        self.upload_cancel_event = threading.Event()
+        threading.Thread(
+            target=target,
+            args=(self.get_notion_uploader(), *args,
+                  self.upload_queue, self.upload_cancel_event),
+            daemon=True,
+        ).start()
+        self.after(UPLOAD_POLL_MS, self.poll_upload_queue)
+
+    def get_notion_uploader(self):
+        """공유 Notion 업로더 반환 (없으면 Notion 모듈을 불러와 생성)"""
+        with self.notion_uploader_lock:
+            if self.notion_uploader is None:
+                from excel_to_notion import NotionUploader
+
+                self.apply_notion_settings()
+                self.notion_uploader = NotionUploader(
+                    self.NOTION_TOKEN,
+                    self.parent_page_id,
+                    self.template_page_id,
+                    template_cache=self.template_cache,
+                    base_url=self.notion_base_url,
+                    session_store=self.session_pages,
+                )
+            return self.notion_uploader
 
-            # 블록 업데이트
-            cloner.update_block()
+    def warm_up_notion(self):
+        """토큰이 저장되어 있으면 백그라운드에서 Notion 모듈을 불러오고 연결을 미리 맺음"""
+        if not self.NOTION_TOKEN:
+            self.NOTION_TOKEN = self.read_notion_token()
+        if self.NOTION_TOKEN:
+            threading.Thread(target=self.run_warm_up, daemon=True).start()
+
+    def run_warm_up(self):
+        """작업 스레드: 업로더 생성과 연결 준비 (실패해도 무시)"""
+        try:
+            self.get_notion_uploader().warm_up()
+        except Exception as e:
+            print(f"Notion 연결 준비 중 오류: {e}")
+
+    def run_upload(self, uploader, result, session_date, update_existing, events, cancel_event):
+        """작업 스레드: 템플릿 복제와 테이블 채우기, 또는 기존 페이지 갱신 (Tk 위젯에 접근하지 않음)"""
+        from excel_to_notion import UploadCancelled
+
+        try:
+            # 실행 시간 측정 시작
+            t1 = time.time()
+
+            # 템플릿 페이지 복제 및 블록 업데이트
+            with span('upload', 'upload'):
+                page_url = uploader.upload(
+                    result,
+                    progress=lambda event, info: events.put((event, info)),
+                    cancel_event=cancel_event,
+                    session_date=session_date,
+                    update_existing=update_existing,
+                )
 
             # 실행 시간 측정 종료
-            t2 = time.time()
-            elapsed_time = t2 - t1
+            events.put(('done', {'url': page_url, 'elapsed': time.time() - t1}))
+        except UploadCancelled:
+            events.put(('cancelled', {}))
+        except Exception as e:
+            events.put(('error', {'message': str(e)}))
+
+    def run_batch_upload(self, uploader, sessions, update_existing, events, cancel_event):
+        """작업 스레드: 여러 세션을 겹쳐서 업로드 (Tk 위젯에 접근하지 않음)"""
+        from excel_to_notion import UploadCancelled
+
+        try:
+            t1 = time.time()
+            with span('upload_batch', 'upload', sessions=len(sessions)):
+                results = uploader.upload_batch(
+                    sessions,
+                    progress=lambda event, info: (
+                        events.put((event, info)) if event in BATCH_EVENTS else None),
+                    cancel_event=cancel_event,
+                    update_existing=update_existing,
+                )
+            events.put(('batch_done', {'results': results, 'elapsed': time.time() - t1}))
+        except UploadCancelled:
+            events.put(('cancelled', {}))
+        except Exception as e:
+            events.put(('error', {'message': str(e)}))
+
+    def on_close(self):
+        """창을 닫을 때 멈춤 감지기와 Notion 연결 정리 후 종료"""
+        if self.stall_watchdog is not None:
+            self.stall_watchdog.stop()
+        with self.notion_uploader_lock:
+            uploader = self.notion_uploader
+        if uploader is not None:
+            try:
+                uploader.close()
+            except Exception as e:
+                print(f"Notion 연결 정리 중 오류: {e}")
+        self.destroy()
+
+    def refresh_template_cache(self):
+        """저장된 템플릿 캐시 삭제 (다음 업로드 때 템플릿을 다시 읽음)"""
+        self.template_cache.invalidate(self.template_page_id)
+        self.status_bar.config(text="템플릿 캐시를 삭제했습니다. 다음 업로드 때 템플릿을 다시 읽습니다.")
+
+    def cancel_upload(self):
+        """진행 중인 업로드 취소 (이후 API 호출 중단)"""
+        if getattr(self, 'upload_cancel_event', None) is not None:
+            self.upload_cancel_event.set()
+            self.cancel_upload_button.config(state=tk.DISABLED)
+            self.notion_status_label.config(text="업로드 취소 중...", foreground="orange")
+
+    def poll_upload_queue(self):
+        """작업 스레드가 보낸 진행 상황을 UI에 반영"""
+        finished = False
+        try:
+            while True:
+                event, info = self.upload_queue.get_nowait()
+                finished = self.handle_upload_event(event, info) or finished
+        except queue.Empty:
+            pass
+
+        if finished:
+            self.upload_button.config(state=tk.NORMAL)
+            self.batch_upload_button.config(state=tk.NORMAL)
+            self.cancel_upload_button.config(state=tk.DISABLED)
+            self.refresh_perf_panel()
+        else:
+            self.after(UPLOAD_POLL_MS, self.poll_upload_queue)
+
+    def handle_upload_event(self, event, info):
+        """업로드 이벤트 하나 처리, 업로드가 끝났으면 True 반환"""
+        if event == 'page_created':
+            self.notion_page_url = info['url']
+            if info.get('resumed'):
+                self.notion_status_label.config(text="중단된 업로드를 이어서 진행 중...")
+            else:
+                self.notion_status_label.config(text="페이지 생성 완료, 템플릿 복사 중...")
+        elif event == 'template_copied':
+            self.notion_status_label.config(text="템플릿 복사 완료, 테이블 채우는 중...")
+        elif event == 'table_filled':
+            self.notion_status_label.config(
+                text=f"테이블 채우는 중... ({info['done']}/{info['total']})")
+        elif event == 'page_synced':
+            self.notion_page_url = info['url']
+            self.notion_status_label.config(
+                text=f"기존 페이지 갱신 (수정 {info['updated']}행, "
+                     f"추가 {info['added']}행, 삭제 {info['removed']}행)")
+        elif event in ('session_done', 'session_failed'):
+            self.notion_status_label.config(
+                text=f"일괄 업로드 중... ({info['done']}/{info['total']}, {info['session']} "
+                     f"{'완료' if event == 'session_done' else '실패'})")
+            if event == 'session_failed':
+                print(f"{info['session']} 세션 업로드 실패: {info['error']}")
+        elif event == 'batch_done':
+            results = info['results']
+            failed = {day: error for day, error in results.items()
+                      if isinstance(error, Exception)}
+            self.notion_status_label.config(
+                text=f"일괄 업로드 완료 {len(results) - len(failed)}/{len(results)} "
+                     f"(소요 시간: {info['elapsed']:.1f}초)",
+                foreground="red" if failed else "green")
+            self.status_bar.config(text=f"Notion 일괄 업로드 완료: {len(results)}개 세션")
+            message = f"{len(results) - len(failed)}개 세션을 업로드했습니다."
+            if failed:
+                message += "\n\n실패한 세션 (다시 업로드하면 이어서 진행합니다):\n" + "\n".join(
+                    f"{day}: {error}" for day, error in sorted(failed.items()))
+                messagebox.showwarning("일괄 업로드", message)
+            else:
+                messagebox.showinfo("일괄 업로드", message)
+            return True
+        elif event == 'retry':
+            self.notion_status_label.config(
+                text=f"요청 재시도 중... ({info['attempt']}번째, {info['delay']:.1f}초 후)")
+        elif event == 'done':
+            self.notion_page_url = info['url']
 
             # 링크 레이블 새로 설정
             self.notion_link_label.config(
@@ -554,7 +784,7 @@ class SmashTeamGenerator(tk.Tk):
 
             # 상태 및 소요 시간 표시
             self.notion_status_label.config(
-                text=f"업로드 완료 (소요 시간: {elapsed_time:.1f}초)",
+                text=f"업로드 완료 (소요 시간: {info['elapsed']:.1f}초)",
                 foreground="green"
             )
 
@@ -564,9 +794,13 @@ class SmashTeamGenerator(tk.Tk):
 
             # 성공 메시지 표시
             messagebox.showinfo("성공", "Notion에 팀 구성 데이터가 성공적으로 업로드되었습니다.")
-
-        except Exception as e:
-            error_msg = str(e)
+            return True
+        elif event == 'cancelled':
+            self.notion_status_label.config(text="업로드 취소됨", foreground="red")
+            self.status_bar.config(text="Notion 업로드가 취소되었습니다")
+            return True
+        elif event == 'error':
+            error_msg = info['message']
             self.notion_link_label.config(text="")
             self.notion_status_label.config(text="업로드 실패", foreground="red")
             self.status_bar.config(text=f"Notion 업로드 오류: {error_msg}")
@@ -578,6 +812,49 @@ class SmashTeamGenerator(tk.Tk):
                                      "VPN이 켜져 있다면 끄고 다시 시도해보세요.")
             else:
                 messagebox.showerror("Notion 업로드 오류", error_msg)
+            return True
+        return False
+
+    def toggle_perf_panel(self):
+        """성능 패널 표시/숨김"""
+        if self.perf_panel_var.get():
+            self.perf_frame.pack(fill=tk.X, padx=5, pady=5)
+            self.refresh_perf_panel()
+        else:
+            self.perf_frame.pack_forget()
+
+    def refresh_perf_panel(self):
+        """기록된 span을 단계별로 묶어 패널에 표시 (숨겨져 있으면 건너뜀)"""
+        if not self.perf_panel_var.get():
+            return
+        self.perf_table.render(
+            ((name, count, f"{total * 1000:.1f}", f"{longest * 1000:.1f}",
+              size or '', retries or ''),
+             (category,) if category == 'notion' else ())
+            for name, category, count, total, longest, size, retries in tracer.summary()
+        )
+
+    def clear_perf_records(self):
+        """지금까지 기록된 span 삭제"""
+        tracer.clear()
+        self.refresh_perf_panel()
+
+    def export_trace(self):
+        """기록된 span을 Chrome trace JSON으로 저장 (chrome://tracing, ui.perfetto.dev)"""
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            initialdir=self.config_dir,
+            initialfile="trace.json",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+        )
+        if not path:
+            return
+        try:
+            tracer.export(path)
+            self.status_bar.config(text=f"성능 기록 저장 완료: {path}")
+        except Exception as e:
+            messagebox.showerror("오류", str(e))
 
     def open_notion_page(self, event):
         """Notion 페이지 링크 클릭 시 웹 브라우저에서 열기"""
@@ -591,13 +868,8 @@ class SmashTeamGenerator(tk.Tk):
             default_yaml_path = resource_path('groups.yaml')
 
             try:
-                # 기본 파일 내용 읽기
-                with open(default_yaml_path, 'r', encoding='utf-8') as src_file:
-                    yaml_content = src_file.read()
-
                 # 사용자 디렉토리에 파일 복사
-                with open(self.yaml_file_path, 'w', encoding='utf-8') as dst_file:
-                    dst_file.write(yaml_content)
+                shutil.copyfile(default_yaml_path, self.yaml_file_path)
             except Exception as e:
                 print(f"YAML 파일 복사 중 오류: {e}")
 
@@ -632,22 +904,72 @@ class SmashTeamGenerator(tk.Tk):
         except Exception as e:
             messagebox.showerror("오류", f"폴더를 열 수 없습니다: {e}")
 
-    def load_notion_token(self):
-        """설정 파일에서 Notion 토큰을 로드하거나 사용자에게 요청"""
+    def read_notion_token(self):
+        """설정 파일에 저장된 Notion 토큰 반환 (없으면 None)"""
+        if os.path.exists(self.config_file_path):
+            config = configparser.ConfigParser()
+            try:
+                config.read(self.config_file_path)
+                if 'Notion' in config and 'token' in config['Notion']:
+                    return config['Notion']['token']
+            except Exception as e:
+                print(f"설정 파일 로드 중 오류: {e}")
+        return None
+
+    def apply_notion_settings(self):
+        """config.ini [Notion]의 base_url, parent_page_id, template_page_id 적용
+
+        로컬 대역 서버(benchmarks.fake_notion_server)로 업로드를 시험할 때 사용한다.
+        """
+        config = configparser.ConfigParser()
+        try:
+            config.read(self.config_file_path)
+        except Exception as e:
+            print(f"설정 파일 로드 중 오류: {e}")
+            return
+        if 'Notion' not in config:
+            return
+        section = config['Notion']
+        self.notion_base_url = section.get('base_url') or self.notion_base_url
+        self.parent_page_id = section.get('parent_page_id') or self.parent_page_id
+        self.template_page_id = section.get('template_page_id') or self.template_page_id
+
+    def start_stall_watchdog(self):
+        """config.ini [Watchdog]의 enabled, threshold_ms를 읽어 UI 멈춤 감지 시작"""
+        enabled, threshold_ms = True, STALL_THRESHOLD_MS
         config = configparser.ConfigParser()
+        try:
+            config.read(self.config_file_path)
+            if 'Watchdog' in config:
+                section = config['Watchdog']
+                enabled = section.getboolean('enabled', fallback=enabled)
+                threshold_ms = section.getint('threshold_ms', fallback=threshold_ms)
+        except Exception as e:
+            print(f"설정 파일 로드 중 오류: {e}")
+        if not enabled:
+            return
+        try:
+            self.stall_watchdog = StallWatchdog(
+                self, self.stall_log_path, threshold_ms=threshold_ms).start()
+        except Exception as e:
+            print(f"UI 멈춤 감지 시작 중 오류: {e}")
 
-        # 기본 토큰 (개발용, 실제 배포 시 빈 문자열로 변경)
-        default_token = ""
+    def load_notion_token(self):
+        """설정 파일에서 Notion 토큰을 로드하거나 사용자에게 요청"""
+        token = self.read_notion_token()
+        if token:
+            return token
 
-        # 설정 파일이 있는지 확인
+        config = configparser.ConfigParser()
         if os.path.exists(self.config_file_path):
             try:
                 config.read(self.config_file_path)
-                if 'Notion' in config and 'token' in config['Notion']:
-                    return config['Notion']['token']
             except Exception as e:
                 print(f"설정 파일 로드 중 오류: {e}")
 
+        # 기본 토큰 (개발용, 실제 배포 시 빈 문자열로 변경)
+        default_token = ""
+
         # 설정 파일이 없거나 토큰이 없으면 사용자에게 요청
         token = self.ask_for_notion_token(default_token)
 
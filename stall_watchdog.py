@@ -0,0 +1,130 @@
+"""Tk 이벤트 루프 멈춤 감지기
+
+메인 스레드에서 after()로 일정 간격마다 심장박동(heartbeat)을 남기고,
+감시 스레드가 마지막 박동 이후 흐른 시간을 확인한다. 박동이 threshold_ms 넘게
+늦어지면 멈춘 동안 메인 스레드의 스택을 주기적으로 수집해 두었다가, 이벤트 루프가
+다시 돌기 시작할 때 멈춘 시간과 가장 자주 잡힌 스택을 로그 파일에 남긴다.
+"""
+import logging
+import logging.handlers
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+from tracing import tracer
+
+
+# 기본 설정값 (config.ini [Watchdog]에서 바꿀 수 있음)
+HEARTBEAT_MS = 100
+STALL_THRESHOLD_MS = 500
+SAMPLE_INTERVAL_MS = 50
+
+# 로그 파일 크기 제한 (넘으면 stall.log.1, .2 ...로 넘김)
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# 로그에 남길 스택 수 (많이 잡힌 순)
+MAX_LOGGED_STACKS = 3
+
+
+def stall_logger(log_path):
+    """멈춤 기록용 로거 (크기 제한이 있는 회전 로그 파일)"""
+    logger = logging.getLogger('smash.stall')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not any(getattr(handler, 'baseFilename', None) == log_path
+               for handler in logger.handlers):
+        handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+            encoding='utf-8', delay=True)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        logger.addHandler(handler)
+    return logger
+
+
+class StallWatchdog:
+    """Tk 이벤트 루프가 threshold_ms 넘게 멈추면 멈춘 시간과 메인 스레드 스택을 기록
+
+    start()는 Tk 메인 스레드에서 호출해야 한다.
+    """
+
+    def __init__(self, root, log_path, threshold_ms=STALL_THRESHOLD_MS,
+                 heartbeat_ms=HEARTBEAT_MS, sample_interval_ms=SAMPLE_INTERVAL_MS):
+        self.root = root
+        self.logger = stall_logger(log_path)
+        self.threshold = threshold_ms / 1000
+        self.heartbeat_ms = heartbeat_ms
+        self.sample_interval = sample_interval_ms / 1000
+        self.stall_count = 0
+
+        self._last_beat = time.perf_counter()
+        self._main_ident = None
+        self._after_id = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._main_ident = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._after_id = self.root.after(self.heartbeat_ms, self._beat)
+        self._thread = threading.Thread(target=self._watch, name='stall-watchdog', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _beat(self):
+        """메인 스레드: 박동 시각 기록 후 다음 박동 예약"""
+        self._last_beat = time.perf_counter()
+        if not self._stop.is_set():
+            self._after_id = self.root.after(self.heartbeat_ms, self._beat)
+
+    def _overdue(self, beat):
+        """마지막 박동 이후 예정보다 늦어진 시간(초)"""
+        return time.perf_counter() - beat - self.heartbeat_ms / 1000
+
+    def _watch(self):
+        """감시 스레드: 박동이 늦어지면 멈춘 동안 스택 수집"""
+        while not self._stop.wait(self.sample_interval):
+            beat = self._last_beat
+            if self._overdue(beat) < self.threshold:
+                continue
+
+            # 멈춤 시작: 박동이 다시 올 때까지 스택 수집
+            samples = Counter()
+            while self._last_beat == beat and not self._stop.is_set():
+                stack = self._sample()
+                if stack is not None:
+                    samples[stack] += 1
+                self._stop.wait(self.sample_interval)
+            if self._stop.is_set():
+                return
+            self._report(beat, self._last_beat, samples)
+
+    def _sample(self):
+        frame = sys._current_frames().get(self._main_ident)
+        if frame is None:
+            return None
+        return tuple(traceback.format_stack(frame))
+
+    def _report(self, beat, resumed, samples):
+        stalled = resumed - beat - self.heartbeat_ms / 1000
+        self.stall_count += 1
+        tracer.record('stall', beat + self.heartbeat_ms / 1000, stalled, 'ui',
+                      samples=sum(samples.values()))
+
+        lines = [f"이벤트 루프 멈춤 {stalled * 1000:.0f}ms (스택 샘플 {sum(samples.values())}개)"]
+        for stack, count in samples.most_common(MAX_LOGGED_STACKS):
+            lines.append(f"--- {count}회 ---")
+            lines.append(''.join(stack).rstrip())
+        self.logger.warning('\n'.join(lines))
+        print(f"UI 멈춤 감지: {stalled * 1000:.0f}ms")
@@ -0,0 +1,154 @@
+"""여러 세션의 팀 생성을 한 번에 처리하는 배치 실행기
+
+사용법:
+    python -m team_batch SESSIONS_DIR [-o OUTPUT_DIR] [-g groups.yaml] [-j WORKERS]
+                         [--xlsx] [--delimited {csv,tsv}]
+
+SESSIONS_DIR 아래의 하위 폴더 하나가 세션 하나이며, examples 폴더와 같이
+jielong.txt (필수)와 lesson.txt (선택)를 담는다. 세션마다 결과를
+OUTPUT_DIR/<세션 이름>.json 으로 저장한다. 인원이 홀수이면 정렬 순서상
+마지막 인원이 单打가 된다. --xlsx를 주면 같은 이름의 xlsx(및 CSV/TSV)도 함께 저장한다.
+
+세션 폴더 이름에 날짜(예: 2025-03-01, 25.3.1, 20250301)가 들어 있으면
+앱의 일괄 Notion 업로드가 그 날짜로 페이지를 만든다.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from result_export import DELIMITERS, export_xlsx
+from roster import RosterCache
+from team_engine import generate_teams
+
+
+JIELONG_FILE = 'jielong.txt'
+LESSON_FILE = 'lesson.txt'
+
+# 세션 폴더 이름에서 날짜를 찾는 패턴 (앞의 것부터 시도, 두 자리 연도는 2000년대)
+DATE_PATTERNS = [
+    re.compile(r'(?<!\d)(\d{4})[-._](\d{1,2})[-._](\d{1,2})(?!\d)'),
+    re.compile(r'(?<!\d)(\d{2})[-._](\d{1,2})[-._](\d{1,2})(?!\d)'),
+    re.compile(r'(?<!\d)(\d{4})(\d{2})(\d{2})(?!\d)'),
+    re.compile(r'(?<!\d)(\d{2})(\d{2})(\d{2})(?!\d)'),
+]
+
+# 작업 프로세스마다 한 번만 받는 로스터 색인
+_roster = None
+
+
+def _init_worker(roster):
+    global _roster
+    _roster = roster
+
+
+def _read_text(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return ''
+
+
+def find_sessions(sessions_dir):
+    """jielong.txt가 있는 하위 폴더를 세션으로 간주 (이름순)"""
+    return sorted(
+        entry.path for entry in os.scandir(sessions_dir)
+        if entry.is_dir() and os.path.isfile(os.path.join(entry.path, JIELONG_FILE))
+    )
+
+
+def session_date(session_dir):
+    """세션 폴더 이름에 들어 있는 날짜 (없거나 잘못된 날짜면 None)"""
+    name = os.path.basename(os.path.normpath(session_dir))
+    for pattern in DATE_PATTERNS:
+        match = pattern.search(name)
+        if match is None:
+            continue
+        year, month, day = (int(part) for part in match.groups())
+        try:
+            return date(year if year >= 100 else 2000 + year, month, day)
+        except ValueError:
+            continue
+    return None
+
+
+def load_session(session_dir, roster):
+    """세션 폴더의 接龙/레슨 텍스트로 팀 생성 (홀수이면 정렬 순서상 마지막 인원이 单打)"""
+    return generate_teams(
+        _read_text(os.path.join(session_dir, JIELONG_FILE)),
+        _read_text(os.path.join(session_dir, LESSON_FILE)),
+        roster,
+    )
+
+
+def process_session(session_dir, output_dir, xlsx=False, delimited=None):
+    """세션 하나의 팀 생성 후 결과 저장, (세션 이름, 오류 메시지) 반환"""
+    name = os.path.basename(os.path.normpath(session_dir))
+    try:
+        result = load_session(session_dir, _roster)
+        out_path = os.path.join(output_dir, f"{name}.json")
+        with open(out_path, 'w', encoding='utf-8') as f:
+            json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+        if xlsx:
+            export_xlsx(result, os.path.join(output_dir, f"{name}.xlsx"), delimited)
+        return name, None
+    except Exception as e:
+        return name, str(e)
+
+
+def run_batch(sessions_dir, output_dir, roster, max_workers=None,
+              xlsx=False, delimited=None):
+    """모든 세션을 프로세스 풀에서 처리, {세션 이름: 오류 메시지 또는 None} 반환
+
+    roster(RosterIndex)는 호출하는 쪽에서 한 번 읽어 두고, 작업 프로세스마다 복사본을 받는다.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    sessions = find_sessions(sessions_dir)
+    with ProcessPoolExecutor(max_workers=max_workers,
+                             initializer=_init_worker,
+                             initargs=(roster,)) as executor:
+        count = len(sessions)
+        return dict(executor.map(process_session, sessions, [output_dir] * count,
+                                 [xlsx] * count, [delimited] * count))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m team_batch', description="세션 폴더 일괄 팀 생성")
+    parser.add_argument('sessions_dir', help="세션 폴더들이 들어 있는 폴더")
+    parser.add_argument('-o', '--output-dir', default='results',
+                        help="결과 저장 폴더 (기본값: results)")
+    parser.add_argument('-g', '--groups', default='groups.yaml',
+                        help="그룹 설정 파일 (기본값: groups.yaml)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="작업 프로세스 수 (기본값: CPU 코어 수)")
+    parser.add_argument('--xlsx', action='store_true',
+                        help="세션별 결과를 xlsx로도 저장")
+    parser.add_argument('--delimited', choices=sorted(DELIMITERS),
+                        help="xlsx와 함께 시트별 CSV/TSV도 저장 (--xlsx 필요)")
+    args = parser.parse_args(argv)
+
+    if args.delimited and not args.xlsx:
+        parser.error("--delimited는 --xlsx와 함께 사용해야 합니다")
+
+    # 작업 프로세스를 띄우기 전에 한 번 읽어 잘못된 경로나 형식을 바로 알림
+    try:
+        roster = RosterCache().get(args.groups)
+    except Exception as e:
+        parser.error(f"그룹 설정 파일을 읽을 수 없습니다: {args.groups} ({e})")
+
+    results = run_batch(args.sessions_dir, args.output_dir,
+                        roster, args.workers, args.xlsx, args.delimited)
+    failed = {name: err for name, err in results.items() if err}
+    for name, err in failed.items():
+        print(f"[실패] {name}: {err}", file=sys.stderr)
+    print(f"팀 생성 완료: {len(results) - len(failed)}/{len(results)} 세션")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""GUI 없이 동작하는 팀 생성 엔진 (파싱, 정렬, 레슨 제외, 페어링, 조 편성)"""
+import bisect
+from collections import Counter
+from dataclasses import dataclass, field
+
+from jielong_tokenizer import COACH_MARK, tokenize
+from roster import RosterIndex
+from tracing import span
+
+
+GROUP_NAMES = ('A', 'B', 'C')
+
+# 페어링 행 종류 (Treeview 태그와 동일한 이름 사용)
+ROW_PAIR = 'pair'
+ROW_SOLO = 'solo'
+ROW_LESSON = 'lesson'
+
+
+@dataclass
+class TeamResult:
+    """팀 생성 결과"""
+    pairs: list = field(default_factory=list)    # [(t1, t2, kind), ...]
+    groups: dict = field(default_factory=dict)   # {'A': [...], 'B': [...], 'C': [...]}
+    attendees: int = 0                           # 접룡 인원 수
+    solo_player: str = None
+
+    def pairing_rows(self):
+        """(No., 팀1, 팀2, 종류) 행 목록"""
+        return [(i, t1, t2, kind)
+                for i, (t1, t2, kind) in enumerate(self.pairs, start=1)]
+
+    def group_rows(self):
+        """(No., A, B, C) 행 목록 (짧은 조는 빈 문자열로 채움)"""
+        columns = [self.groups.get(g, []) for g in GROUP_NAMES]
+        max_length = max((len(col) for col in columns), default=0)
+        return [
+            (i + 1, *(col[i] if i < len(col) else '' for col in columns))
+            for i in range(max_length)
+        ]
+
+    def to_dict(self):
+        return {
+            'attendees': self.attendees,
+            'solo_player': self.solo_player,
+            'pairs': [list(pair) for pair in self.pairs],
+            'groups': {g: list(self.groups.get(g, [])) for g in GROUP_NAMES},
+        }
+
+
+def parse_jielong(content):
+    """接龙 내용에서 참가자 명단 추출"""
+    if not content.strip():
+        raise ValueError("接龙 내용을 입력해주세요")
+
+    entries = tokenize(content)
+    if not entries:
+        raise ValueError("접룡 내용에 '1.' 표시가 없습니다")
+    return [entry.name for entry in entries]
+
+
+def parse_lesson(content):
+    """레슨 명단 추출 (코치 제외, lesson_names 참고)"""
+    if not content.strip():
+        return []
+
+    entries = tokenize(content)
+    if not entries:
+        raise ValueError("레슨 인원에 '1.' 표시가 없습니다")
+    return lesson_names(entries)
+
+
+def lesson_names(entries):
+    """레슨 명단 Entry에서 제외할 이름 목록
+
+    "1. 코치 소동섭"처럼 이름이 있는 코치는 참가자에서 빼야 하므로 남기고,
+    "김코치"처럼 이름 없이 코치 표시만 있는 줄은 그룹 설정에 없으므로 뺀다.
+    """
+    return [entry.name for entry in entries
+            if not (entry.is_coach and COACH_MARK in entry.name)]
+
+
+def order_attendees(names, roster):
+    """그룹 설정(groups.yaml) 순서대로 참가자 정렬"""
+    return roster.order(names)
+
+
+def exclude_lesson(ordered_names, lesson_names):
+    """참가자 명단에서 레슨 인원 제외"""
+    lesson_set = set(lesson_names)
+    return [name for name in ordered_names if name not in lesson_set]
+
+
+def pick_last_player(pairing_list):
+    """기본 单打 인원 선택: 정렬 순서상 마지막 인원"""
+    return pairing_list[-1] if pairing_list else None
+
+
+def fold_pairs(pairing_list):
+    """정렬된 명단을 반으로 접어 페어링 (1등-꼴등, 2등-뒤에서 2등 ...)"""
+    half = len(pairing_list) // 2
+    first_column = pairing_list[:half]
+    second_column = pairing_list[half:][::-1]
+    return list(zip(first_column, second_column))
+
+
+def pair_lessons(lesson_names):
+    """레슨 인원을 순서대로 두 명씩 묶음"""
+    return [
+        (lesson_names[i], lesson_names[i+1] if i+1 < len(lesson_names) else '')
+        for i in range(0, len(lesson_names), 2)
+    ]
+
+
+def group_attendees(names, roster):
+    """참가자를 A/B/C 조로 분리 (그룹 설정 순서 유지)"""
+    return roster.split_groups(names, GROUP_NAMES)
+
+
+def as_roster(roster_or_groups_data):
+    """groups.yaml 데이터(dict)도 받을 수 있도록 RosterIndex로 변환"""
+    if isinstance(roster_or_groups_data, RosterIndex):
+        return roster_or_groups_data
+    return RosterIndex(roster_or_groups_data)
+
+
+def generate_teams(jielong_content, lesson_content, roster, choose_solo=None):
+    """接龙/레슨 텍스트와 로스터(RosterIndex 또는 groups.yaml 데이터)로 팀 생성
+
+    인원이 홀수이면 choose_solo(pairing_list)로 单打 인원을 정한다.
+    choose_solo가 없으면 정렬 순서상 마지막 인원이 单打가 된다.
+    """
+    roster = as_roster(roster)
+    with span('parse') as info:
+        jielong_names_list = parse_jielong(jielong_content)
+        lesson_names_list = parse_lesson(lesson_content or '')
+        info['names'] = len(jielong_names_list)
+
+    # 1st 페어링 편성
+    with span('sort'):
+        jielong_ordered_list = order_attendees(jielong_names_list, roster)
+    pairing_list = exclude_lesson(jielong_ordered_list, lesson_names_list)
+
+    solo_player = None
+    if len(pairing_list) % 2 != 0:
+        # 선택 창을 기다리는 시간은 span에 넣지 않음
+        solo_player = (choose_solo or pick_last_player)(pairing_list)
+        if not solo_player:
+            raise ValueError("팀 생성에 필요한 单打 인원을 선택해야 합니다")
+        pairing_list.remove(solo_player)
+
+    with span('pairing'):
+        pairs = [(t1, t2, ROW_PAIR) for t1, t2 in fold_pairs(pairing_list)]
+        if solo_player:
+            pairs.append((solo_player, '', ROW_SOLO))
+        pairs.extend((t1, t2, ROW_LESSON) for t1, t2 in pair_lessons(lesson_names_list))
+
+    # 2nd 조 편성
+    with span('grouping'):
+        groups = group_attendees(jielong_names_list, roster)
+
+    return TeamResult(
+        pairs=pairs,
+        groups=groups,
+        attendees=len(jielong_names_list),
+        solo_player=solo_player,
+    )
+
+
+class LiveSession:
+    """입력이 바뀔 때마다 달라진 인원만 반영하는 증분 팀 생성 상태
+
+    정렬된 페어링 명단과 조별 명단을 유지하면서, 새로 들어온 이름은 이진 탐색으로
+    끼워 넣고 빠진 이름만 지운다. 인원이 홀수이면 이전 单打 인원이 남아 있는 한
+    그대로 유지하고, 아니면 정렬 순서상 마지막 인원을 单打로 둔다.
+    """
+
+    def __init__(self, roster):
+        self.roster = as_roster(roster)
+        self._rank = lambda name: self.roster.positions[name][1]
+        self._attendees = Counter()   # 접룡 인원 (중복 이름 포함)
+        self._eligible = Counter()    # 페어링 대상 (레슨 인원 제외)
+        self._pairing = []            # 페어링 대상 (그룹 설정 순서)
+        self._groups = {g: [] for g in GROUP_NAMES}
+        self._solo_player = None
+
+    def _insert(self, names, name):
+        bisect.insort(names, name, key=self._rank)
+
+    def _remove(self, names, name):
+        i = bisect.bisect_left(names, self._rank(name), key=self._rank)
+        while names[i] != name:
+            i += 1
+        del names[i]
+
+    def update(self, jielong_names, lesson_names):
+        """새 명단을 반영하고 (결과, 추가된 이름, 빠진 이름) 반환"""
+        with span('live_update'):
+            return self._update(jielong_names, lesson_names)
+
+    def _update(self, jielong_names, lesson_names):
+        attendees = Counter(jielong_names)
+        lesson_set = set(lesson_names)
+        eligible = Counter({name: count for name, count in attendees.items()
+                            if name not in lesson_set})
+
+        added = attendees - self._attendees
+        removed = self._attendees - attendees
+        self.roster.check_known(added)
+
+        # 페어링 대상 증감 반영
+        for name, count in (self._eligible - eligible).items():
+            for _ in range(count):
+                self._remove(self._pairing, name)
+        for name, count in (eligible - self._eligible).items():
+            for _ in range(count):
+                self._insert(self._pairing, name)
+
+        # 조 편성 증감 반영 (조 안에서는 중복 없이)
+        for name in removed:
+            if name not in attendees:
+                group = self._groups.get(self.roster.group_of(name))
+                if group is not None:
+                    self._remove(group, name)
+        for name in added:
+            if name not in self._attendees:
+                group = self._groups.get(self.roster.group_of(name))
+                if group is not None:
+                    self._insert(group, name)
+
+        self._attendees = attendees
+        self._eligible = eligible
+        return self._result(lesson_names), added, removed
+
+    def _result(self, lesson_names):
+        pairing_list = self._pairing
+        solo_player = None
+        if len(pairing_list) % 2 != 0:
+            if self._solo_player in self._eligible:
+                solo_player = self._solo_player
+            else:
+                solo_player = pick_last_player(pairing_list)
+            pairing_list = list(pairing_list)
+            pairing_list.remove(solo_player)
+        self._solo_player = solo_player
+
+        pairs = [(t1, t2, ROW_PAIR) for t1, t2 in fold_pairs(pairing_list)]
+        if solo_player:
+            pairs.append((solo_player, '', ROW_SOLO))
+        pairs.extend((t1, t2, ROW_LESSON) for t1, t2 in pair_lessons(lesson_names))
+
+        return TeamResult(
+            pairs=pairs,
+            groups={g: list(names) for g, names in self._groups.items()},
+            attendees=sum(self._attendees.values()),
+            solo_player=solo_player,
+        )
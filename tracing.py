@@ -0,0 +1,140 @@
+"""단계별 소요 시간을 기록하는 가벼운 추적(tracing) 계층
+
+with span('pairing'): 처럼 감싼 구간마다 시작 시각과 소요 시간을 기록한다.
+Notion 요청은 RequestScheduler가 요청 하나(재시도 포함)마다 span을 남기고,
+httpx 응답 훅(record_response)이 상태 코드와 주고받은 바이트 수를 채운다.
+기록은 단계별 요약(summary)이나 Chrome trace JSON(chrome://tracing, Perfetto)으로 볼 수 있다.
+"""
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+# 메모리에 보관하는 최대 span 수 (오래된 것부터 버림)
+MAX_SPANS = 20000
+
+# 진행 중인 Notion 요청 span의 args (httpx 응답 훅이 채움)
+current_request = contextvars.ContextVar('current_request', default=None)
+
+
+class Span:
+    __slots__ = ('name', 'category', 'start', 'duration', 'thread', 'lane', 'args')
+
+    def __init__(self, name, category, start, duration, thread, lane, args):
+        self.name = name
+        self.category = category
+        self.start = start        # time.perf_counter() 기준 시작 시각(초)
+        self.duration = duration  # 초
+        self.thread = thread      # 스레드 이름
+        self.lane = lane          # 같은 스레드 안의 asyncio 작업 구분 (없으면 0)
+        self.args = args
+
+
+def _lane():
+    # asyncio를 불러오지 않았다면 실행 중인 작업도 없음 (시작 시 asyncio를 불러오지 않도록)
+    asyncio = sys.modules.get('asyncio')
+    if asyncio is None:
+        return 0
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        return 0
+    return id(task) if task is not None else 0
+
+
+class Tracer:
+    """span 기록 저장소 (여러 스레드에서 동시에 기록 가능)"""
+
+    def __init__(self, max_spans=MAX_SPANS):
+        self.enabled = True
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+        self.origin = time.perf_counter()
+
+    def record(self, name, start, duration, category='local', **args):
+        if not self.enabled:
+            return
+        span = Span(name, category, start, duration,
+                    threading.current_thread().name, _lane(), args)
+        with self._lock:
+            self._spans.append(span)
+
+    @contextmanager
+    def span(self, name, category='local', **args):
+        """구간 소요 시간 기록, with 블록 안에서 args(dict)에 값을 더할 수 있음"""
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.record(name, start, time.perf_counter() - start, category, **args)
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+        self.origin = time.perf_counter()
+
+    def summary(self):
+        """이름별 [(이름, 분류, 횟수, 합계 초, 최대 초, 바이트, 재시도), ...] (합계 내림차순)"""
+        totals = {}
+        for span in self.spans():
+            key = (span.name, span.category)
+            count, total, longest, size, retries = totals.get(key, (0, 0.0, 0.0, 0, 0))
+            totals[key] = (count + 1, total + span.duration, max(longest, span.duration),
+                           size + span.args.get('bytes', 0), retries + span.args.get('retries', 0))
+        rows = [(name, category, *values) for (name, category), values in totals.items()]
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows
+
+    def chrome_trace(self):
+        """Chrome trace 형식(dict) (chrome://tracing, ui.perfetto.dev에서 열 수 있음)"""
+        pid = os.getpid()
+        lanes = {}
+        events = []
+        for span in self.spans():
+            tid = lanes.setdefault((span.thread, span.lane), len(lanes) + 1)
+            events.append({
+                'name': span.name, 'cat': span.category, 'ph': 'X',
+                'ts': (span.start - self.origin) * 1e6, 'dur': span.duration * 1e6,
+                'pid': pid, 'tid': tid, 'args': span.args,
+            })
+        for (thread, lane), tid in lanes.items():
+            label = thread if not lane else f"{thread} (작업 {tid})"
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': label}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False, default=str)
+        return path
+
+
+# 앱 전체가 함께 쓰는 기본 추적기
+tracer = Tracer()
+
+
+def span(name, category='local', **args):
+    return tracer.span(name, category, **args)
+
+
+async def record_response(response):
+    """httpx 응답 훅: 진행 중인 요청 span에 상태 코드와 바이트 수 기록
+
+    httpx.AsyncClient(event_hooks={'response': [record_response]})로 등록한다.
+    """
+    args = current_request.get()
+    if args is None:
+        return
+    sent = len(response.request.content or b'')
+    received = int(response.headers.get('content-length') or 0)
+    args['status'] = response.status_code
+    args['bytes'] = args.get('bytes', 0) + sent + received
@@ -0,0 +1,59 @@
+"""Treeview 표시 행을 모델로 관리하고 바뀐 부분만 다시 그리는 렌더링 계층"""
+import tkinter as tk
+
+
+class TreeTable:
+    """Treeview에 표시 중인 행을 기억해 두고 달라진 셀만 Tk에 반영
+
+    행 수와 각 행의 값/태그를 직접 보관하므로 get_children()이나 item() 조회로
+    Tk에 다시 묻지 않는다. 다시 그리는 비용은 바뀐 행 수에 비례한다.
+    """
+
+    def __init__(self, tree, tag_styles=None):
+        self.tree = tree
+        self.columns = tuple(tree['columns'])
+        self._items = []   # 표시 중인 행의 item id
+        self._rows = []    # 표시 중인 행의 (values, tags)
+
+        # 태그 스타일은 처음 한 번만 설정
+        for tag, style in (tag_styles or {}).items():
+            tree.tag_configure(tag, **style)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def rows(self):
+        """표시 중인 (values, tags) 행 목록"""
+        return list(self._rows)
+
+    def render(self, rows):
+        """새 (values, tags) 행 목록을 표시 (바뀐 셀, 추가/삭제된 행만 반영)"""
+        tree = self.tree
+        rows = [(tuple(values), tuple(tags)) for values, tags in rows]
+        common = min(len(rows), len(self._rows))
+
+        for i in range(common):
+            new_values, new_tags = rows[i]
+            old_values, old_tags = self._rows[i]
+            item = self._items[i]
+            if new_values != old_values:
+                changed = [col for col, (old, new)
+                           in enumerate(zip(old_values, new_values)) if old != new]
+                if len(changed) == 1 and len(old_values) == len(new_values):
+                    col = changed[0]
+                    tree.set(item, self.columns[col], new_values[col])
+                else:
+                    tree.item(item, values=new_values)
+            if new_tags != old_tags:
+                tree.item(item, tags=new_tags)
+
+        if len(self._items) > common:
+            tree.delete(*self._items[common:])
+            del self._items[common:]
+        for values, tags in rows[common:]:
+            self._items.append(tree.insert('', tk.END, values=values, tags=tags))
+
+        self._rows = rows
+
+    def clear(self):
+        self.render([])